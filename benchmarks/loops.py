@@ -0,0 +1,85 @@
+# Loops against unrolled straight-line code.
+#
+# The same computation is written once as a while loop and once unrolled
+# into one copy of the body per iteration (what programs had to do before
+# the VM had jumps). Both go through the single pass Parser and through
+# Ast + Compiler; for each the table shows bytecode slots, compile time and
+# run time. The body reads a loop-invariant expression (k * k + 1), which
+# the Compiler hoists out of the loop.
+#
+#   python benchmarks/loops.py [--max 10000] [--runs 5]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pythonvm.lexer import Lexer
+from pythonvm.parser import Parser
+from pythonvm.syntax import Ast
+from pythonvm.compiler import Compiler
+
+SETUP = "var i = 0; var acc = 0; var k = 7;\n"
+BODY = "acc = (acc + i * (k * k + 1)) % 997; i = i + 1;"
+RESULT = "print(acc);\n"
+
+
+def loop_program(iterations):
+    return SETUP + f"while i < {iterations} do begin {BODY} end\n" + RESULT
+
+
+def unrolled_program(iterations):
+    return SETUP + (BODY + "\n") * iterations + RESULT
+
+
+PIPELINES = {
+    "parser": lambda source: Parser(Lexer(source).tokenize()).compile(),
+    "compiler": lambda source: Compiler().compile(Ast(Lexer(source).tokenize()).parse()),
+}
+
+
+def measure(source, pipeline, runs):
+    best = None
+    for _ in range(runs):
+        start = perf_counter()
+        vm = PIPELINES[pipeline](source)
+        compiled = perf_counter() - start
+        output = io.StringIO()
+        start = perf_counter()
+        with contextlib.redirect_stdout(output):
+            vm.run()
+        ran = perf_counter() - start
+        if best is None or compiled + ran < best[1] + best[2]:
+            best = (len(vm.bytecode), compiled, ran, output.getvalue())
+    return best
+
+
+def main():
+    arguments = argparse.ArgumentParser(description="while loops against unrolled code")
+    arguments.add_argument("--max", type=int, default=10000, help="largest iteration count")
+    arguments.add_argument("--runs", type=int, default=5, help="best of this many runs")
+    options = arguments.parse_args()
+
+    print(f"{'iterations':>10} {'pipeline':>9} {'form':>9} {'slots':>8} {'compile':>10} {'run':>10} {'total':>10}")
+    iterations = 10
+    while iterations <= options.max:
+        for pipeline in PIPELINES:
+            outputs = set()
+            for form, program in (("loop", loop_program), ("unrolled", unrolled_program)):
+                slots, compiled, ran, output = measure(program(iterations), pipeline, options.runs)
+                outputs.add(output)
+                print(f"{iterations:>10} {pipeline:>9} {form:>9} {slots:>8} {compiled * 1000:>8.2f}ms "
+                      f"{ran * 1000:>8.2f}ms {(compiled + ran) * 1000:>8.2f}ms")
+            if len(outputs) != 1:
+                print("loop and unrolled programs disagree: " + " / ".join(sorted(outputs)))
+                return 1
+        iterations *= 10
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# Scaling curves for every pipeline stage.
+#
+# Generates programs with pythonvm.generator while one dimension grows by
+# powers of ten (the others stay at their base value), times each stage and
+# optionally records its tracemalloc peak. Between two sizes the growth
+# exponent is log(t2 / t1) / log(n2 / n1) with n the source size in bytes;
+# stages above --limit are flagged as superlinear, and stages that raise
+# (RecursionError in the recursive parsers, for one) are flagged as failing.
+#
+#   python benchmarks/scaling.py [--max 10000] [--memory] [--strict]
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pythonvm.generator import ProgramGenerator
+from pythonvm.lexer import Lexer
+from pythonvm.parser import Parser, PrecedenceParser
+from pythonvm.syntax import Ast
+from pythonvm.compiler import Compiler
+
+BASE = {"statements": 100, "globals": 10, "depth": 4, "literals": 32, "stringSize": 8}
+DIMENSIONS = ("statements", "globals", "depth", "literals", "stringSize")
+
+# stage timings below this are too noisy to judge growth from
+MIN_SECONDS = 0.002
+
+
+def parse_ast(tokens):
+    statements = Ast(tokens).parse()
+    if statements is None:
+        raise Exception("Ast.parse failed")
+    return statements
+
+
+# stage name -> (function, name of the stage whose result it takes)
+STAGES = {
+    "lex": (lambda source: Lexer(source).tokenize(), "source"),
+    "parse": (lambda tokens: Parser(tokens).compile(), "lex"),
+    "precedence": (lambda tokens: PrecedenceParser(tokens).compile(), "lex"),
+    "ast": (parse_ast, "lex"),
+    "compile": (lambda statements: Compiler().compile(statements), "ast"),
+    "run": (lambda vm: vm.run(), "parse"),
+}
+
+
+def measure(source, memory):
+    results = {"source": source}
+    timings = {}
+    for stage, (function, input) in STAGES.items():
+        if input not in results:
+            timings[stage] = ("skipped", None)
+            continue
+        if memory:
+            tracemalloc.start()
+        try:
+            start = perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[stage] = function(results[input])
+            seconds = perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if memory else None
+            timings[stage] = (seconds, peak)
+        except (Exception, RecursionError) as e:
+            timings[stage] = ("failed: " + type(e).__name__, None)
+        finally:
+            if memory:
+                tracemalloc.stop()
+    return timings
+
+
+def main():
+    arguments = argparse.ArgumentParser(description="pipeline scaling curves")
+    arguments.add_argument("--max", type=int, default=10000, help="largest size of a dimension")
+    arguments.add_argument("--seed", type=int, default=0)
+    arguments.add_argument("--limit", type=float, default=1.3, help="largest acceptable growth exponent")
+    arguments.add_argument("--memory", action="store_true", help="record tracemalloc peaks (slower)")
+    arguments.add_argument("--strict", action="store_true", help="exit 1 when something is flagged")
+    arguments.add_argument("--dimension", choices=DIMENSIONS, action="append")
+    options = arguments.parse_args()
+
+    flags = []
+    for dimension in options.dimension or DIMENSIONS:
+        print(f"== {dimension}")
+        header = f"{'size':>8} {'bytes':>10}" + "".join(f" {stage:>12}" for stage in STAGES)
+        print(header)
+        previous = None
+        size = 10
+        while size <= options.max:
+            parameters = dict(BASE, seed=options.seed)
+            parameters[dimension] = size
+            source = ProgramGenerator(**parameters).generate()
+            timings = measure(source, options.memory)
+            row = f"{size:>8} {len(source):>10}"
+            for stage, (seconds, peak) in timings.items():
+                if isinstance(seconds, str):
+                    row += f" {seconds[:12]:>12}"
+                    if seconds.startswith("failed"):
+                        flags.append(f"{dimension}={size}: {stage} {seconds}")
+                    continue
+                cell = f"{seconds * 1000:.1f}ms"
+                if peak is not None:
+                    cell += f"/{peak // 1024}k"
+                row += f" {cell:>12}"
+                if previous is not None:
+                    before, beforeBytes = previous[0].get(stage), previous[1]
+                    if before is not None and not isinstance(before[0], str) and before[0] >= MIN_SECONDS \
+                            and len(source) > beforeBytes:
+                        exponent = math.log(seconds / before[0]) / math.log(len(source) / beforeBytes)
+                        if exponent > options.limit:
+                            flags.append(f"{dimension}={size}: {stage} grows as n^{exponent:.2f}")
+            print(row)
+            previous = (timings, len(source))
+            size *= 10
+
+    print()
+    if flags:
+        print("flagged:")
+        for flag in flags:
+            print("  " + flag)
+    else:
+        print("all stages scale linearly")
+    return 1 if flags and options.strict else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
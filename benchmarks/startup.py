@@ -0,0 +1,83 @@
+# Import-time budget for short-lived processes.
+#
+# Runs `python -X importtime -c <import>` for each scenario, sums the self
+# time of every module it loads beyond a bare interpreter (best of --runs),
+# and fails when a scenario goes over its budget or loads a module it must
+# not need (the VM-only path must never load the front end, enum or re).
+#
+#   python benchmarks/startup.py [--runs 7] [--scale 1.0]
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FRONT_END = ("pythonvm.lexer", "pythonvm.parser", "pythonvm.syntax", "pythonvm.compiler")
+
+# name -> (statement, budget in microseconds, modules that must not load)
+# Budgets sit at 2.5-3x the medians measured on the tree (about 150, 1000,
+# 1600 and 2050us), so a loaded machine passes and a new heavy import does not.
+SCENARIOS = {
+    "package": ("import pythonvm", 1000, FRONT_END + ("pythonvm.vm", "enum", "re")),
+    "vm": ("import pythonvm.vm", 2500, FRONT_END + ("enum", "re", "asyncio")),
+    "frontend": ("import pythonvm.lexer, pythonvm.parser", 4000, ("enum", "re", "asyncio")),
+    "compiler": ("import pythonvm.compiler", 6000, ("enum", "re", "asyncio", "array")),
+}
+
+
+def import_times(statement):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def measure(statement, baseline, runs):
+    best = None
+    modules = set()
+    for _ in range(runs):
+        times = import_times(statement)
+        added = {name: us for name, us in times.items() if name not in baseline}
+        modules |= set(added)
+        total = sum(added.values())
+        if best is None or total < best:
+            best = total
+    return best, modules
+
+
+def main():
+    arguments = argparse.ArgumentParser(description="import-time budget check")
+    arguments.add_argument("--runs", type=int, default=7)
+    arguments.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    options = arguments.parse_args()
+
+    # time imports, not bytecode compilation
+    compileall.compile_dir(os.path.join(ROOT, "pythonvm"), quiet=1)
+    baseline = set(import_times("pass"))
+
+    failed = False
+    print(f"{'scenario':<10} {'us':>8} {'budget':>8}  modules")
+    for name, (statement, budget, forbidden) in SCENARIOS.items():
+        total, modules = measure(statement, baseline, options.runs)
+        budget = int(budget * options.scale)
+        loaded = sorted(module for module in forbidden if module in modules)
+        status = ""
+        if total > budget:
+            status += "  OVER BUDGET"
+        if loaded:
+            status += "  LOADS " + ", ".join(loaded)
+        failed = failed or bool(status)
+        print(f"{name:<10} {total:>8} {budget:>8}  {len(modules)}{status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
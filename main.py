@@ -1,8 +1,5 @@
 
-from lexer import Lexer
-from token import TokenType
-from parser import Parser
-from ast import Ast,Interpreter
+import sys
 
 
 source = '''
@@ -36,11 +33,27 @@ print(2 + 3 * 4 ^ -2);
 
 '''
 
-lexer = Lexer(source)
+if len(sys.argv) > 1 and sys.argv[1].endswith(".pvmc"):
+    # saved chunk: only the VM is needed
+    from pythonvm.vm import load_chunk
+    vm = load_chunk(sys.argv[1])
+    vm.run()
+    vm.print_stack()
+    vm.print_variables()
+    sys.exit()
+
+from pythonvm.lexer import Lexer, FileLexer
+from pythonvm.parser import Parser
+
+if len(sys.argv) > 1:
+    lexer = FileLexer(sys.argv[1])
+else:
+    lexer = Lexer(source)
 tokens = lexer.tokenize()
 # for token in tokens:
 #     print(token)
 
+# from pythonvm.syntax import Ast, Interpreter
 # ast = Ast(tokens)
 # result = ast.parse()
 
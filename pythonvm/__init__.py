@@ -0,0 +1,45 @@
+# Python Virtual Machine & AST
+#
+# Submodules are imported on first use of one of their names, so running a
+# saved chunk only loads pythonvm.vm and short-lived processes pay for the
+# front end (lexer, parser, syntax tree, compiler) only when they need it.
+
+EXPORTS = {
+    "Token": "tokens",
+    "TokenType": "tokens",
+    "Lexer": "lexer",
+    "FileLexer": "lexer",
+    "Parser": "parser",
+    "PrecedenceParser": "parser",
+    "OpCode": "vm",
+    "VirtualMachine": "vm",
+    "GlobalOverlay": "vm",
+    "VMLimitError": "vm",
+    "FuelExhausted": "vm",
+    "DeadlineExceeded": "vm",
+    "OperandTooLarge": "vm",
+    "load_chunk": "vm",
+    "load_snapshot": "vm",
+    "Ast": "syntax",
+    "AstArena": "syntax",
+    "Interpreter": "syntax",
+    "Compiler": "compiler",
+    "Scheduler": "scheduler",
+    "IncrementalCompiler": "incremental",
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -0,0 +1,912 @@
+from .syntax import Binary, Unary, Grouping, Literal, VarDecl, Print, Block, Variable, Assign, If, While
+from .tokens import TokenType, Token
+from .vm import OpCode, VirtualMachine
+from .vector import is_vector, pack
+
+
+# Compiles the statement list returned by Ast.parse() into a VirtualMachine
+# chunk. Unlike Parser, which emits while it reads tokens, the compiler sees
+# the whole program first and can run optimization passes over it:
+#
+#   simplify      constant folding and numeric identities (x*1, x+0, x-0,
+#                 1*x, 0+x, x^1, --x) where x is known to be a number: a
+#                 numeric literal, comparison or '!', arithmetic on numbers,
+#                 or a global this program declares and only ever assigns
+#                 numbers (a string x must still raise). Only integer 0/1
+#                 literals are treated as identities so int/float results
+#                 never change (the one visible difference: x+0 keeps the
+#                 sign of -0.0)
+#   branches      an if with a constant condition keeps only the branch
+#                 taken, a while with a false constant condition is dropped
+#                 (unless the dropped code declares a global)
+#   dead stores   declarations of and assignments to globals that are never
+#                 read anywhere are dropped (repeated until nothing changes);
+#                 an initializer that could raise is still evaluated. Not run
+#                 when compiling into an existing VirtualMachine (vm=), whose
+#                 code and host may read any global
+#   hoisting      in a while loop, invariant expressions (no assignment, no
+#                 global written in the loop) in the condition and in the
+#                 statements every iteration runs, up to the first one that
+#                 prints or stores, are computed once into hidden globals
+#                 ($h0, $h1, ...) before the loop. The loop is guarded by its
+#                 condition, so they are only computed when it runs at least
+#                 once, and the first iteration would have computed them
+#                 before printing or storing anything: one that raises ('/',
+#                 '%', '^', mixed types) leaves the same output and globals
+#   cse           an expression computed more than once with the same inputs
+#                 is stored once in a hidden global ($t0, $t1, ...) and read
+#                 back afterwards; inputs are tracked per assignment, so a
+#                 write to a global ends the reuse of expressions reading it.
+#                 Only straight-line code takes part: the condition of an if
+#                 does, its branches and whole while loops are barriers that
+#                 end the reuse of every global they assign
+#
+# Conditions ending in a comparison compile to one fused OP_COMPARE_JUMP.
+#
+# Expressions have no side effects apart from assignments, which the passes
+# never move or drop unless they store into an unread global.
+#
+# With memoize set, the value of every statement expression that assigns
+# nothing and compiles to at least MEMO_MIN_COST instructions is wrapped in
+# OP_MEMO / OP_MEMO_STORE: the VM caches it keyed by the values of the globals
+# it reads and skips the expression on a hit. Identical expressions share a
+# slot and so a cache.
+
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.OP_ADD,
+    TokenType.MINUS: OpCode.OP_SUBTRACT,
+    TokenType.STAR: OpCode.OP_MULTIPLY,
+    TokenType.SLASH: OpCode.OP_DIVIDE,
+    TokenType.PERCENT: OpCode.OP_MODULO,
+    TokenType.CARET: OpCode.OP_POWER,
+    TokenType.EQUAL_EQUAL: OpCode.OP_EQUAL,
+    TokenType.BANG_EQUAL: OpCode.OP_NOT_EQUAL,
+    TokenType.LESS: OpCode.OP_LESS,
+    TokenType.LESS_EQUAL: OpCode.OP_LESS_EQUAL,
+    TokenType.GREATER: OpCode.OP_GREATER,
+    TokenType.GREATER_EQUAL: OpCode.OP_GREATER_EQUAL,
+}
+COMPARISON_TOKENS = (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL, TokenType.LESS,
+                     TokenType.LESS_EQUAL, TokenType.GREATER, TokenType.GREATER_EQUAL)
+
+# largest integer power folded at compile time, in bits of the result
+MAX_FOLDED_POWER_BITS = 4096
+
+# smallest expression worth memoizing; a hit still costs OP_MEMO and a lookup
+MEMO_MIN_COST = 6
+
+
+def is_number(value):
+    return type(value) is int or type(value) is float
+
+
+# hashable identity of a literal: floats by bit pattern (0.0 and -0.0 differ),
+# vectors by dtype, shape and contents
+def literal_key(value):
+    if type(value) is float:
+        return (float, value.hex())
+    if is_vector(value):
+        return ("vector", pack(value))
+    return (type(value), value)
+
+
+# expressions whose evaluation cannot raise whatever the globals hold
+def cannot_raise(node, numeric):
+    if isinstance(node, (Literal, Variable)):
+        return True
+    if isinstance(node, Grouping):
+        return cannot_raise(node.expression, numeric)
+    if isinstance(node, Assign):
+        return cannot_raise(node.value, numeric)
+    if isinstance(node, Unary):
+        return node.operator.type == TokenType.BANG and numeric(node.right) and cannot_raise(node.right, numeric)
+    if isinstance(node, Binary):
+        return node.operator.type in COMPARISON_TOKENS and numeric(node.left) and numeric(node.right) \
+            and cannot_raise(node.left, numeric) and cannot_raise(node.right, numeric)
+    return False
+
+
+def is_int_literal(node, value):
+    return isinstance(node, Literal) and type(node.value) is int and node.value == value
+
+
+def fold(operator, a, b):
+    if operator == TokenType.PLUS:
+        return a + b
+    elif operator == TokenType.MINUS:
+        return a - b
+    elif operator == TokenType.STAR:
+        return a * b
+    elif operator == TokenType.SLASH:
+        return a / b if b != 0 else None
+    elif operator == TokenType.PERCENT:
+        return a % b if b != 0 else None
+    elif operator == TokenType.CARET:
+        if a == 0 and b < 0:
+            return None
+        if abs(b) > MAX_FOLDED_POWER_BITS:
+            return None
+        if type(a) is int and type(b) is int and b > 0 and a.bit_length() * b > MAX_FOLDED_POWER_BITS:
+            return None
+        try:
+            result = a ** b
+        except OverflowError:
+            return None
+        return result if is_number(result) else None
+    elif operator == TokenType.EQUAL_EQUAL:
+        return 1 if a == b else 0
+    elif operator == TokenType.BANG_EQUAL:
+        return 1 if a != b else 0
+    elif operator == TokenType.LESS:
+        return 1 if a < b else 0
+    elif operator == TokenType.LESS_EQUAL:
+        return 1 if a <= b else 0
+    elif operator == TokenType.GREATER:
+        return 1 if a > b else 0
+    elif operator == TokenType.GREATER_EQUAL:
+        return 1 if a >= b else 0
+    return None
+
+
+# a condition ending in a comparison: the comparison and OP_JUMP_IF_FALSE
+# are emitted as one OP_COMPARE_JUMP
+def fused_condition(node):
+    while isinstance(node, Grouping):
+        node = node.expression
+    return isinstance(node, Binary) and node.operator.type in COMPARISON_TOKENS
+
+
+def count_instructions(statements):
+    count = 0
+    nodes = [(statement, True) for statement in statements]
+    while nodes:
+        node, isStatement = nodes.pop()
+        if isinstance(node, Block):
+            nodes.extend((declaration, True) for declaration in node.declarations)
+        elif isinstance(node, VarDecl):
+            count += 2 + (node.initializer is None)
+            if node.initializer is not None:
+                nodes.append((node.initializer, False))
+        elif isinstance(node, Print):
+            count += 1
+            nodes.append((node.expression, False))
+        elif isinstance(node, If):
+            # OP_JUMP_IF_FALSE, plus OP_JUMP over the else branch
+            count += 1 + (node.elseBranch is not None) - fused_condition(node.condition)
+            nodes.append((node.condition, False))
+            nodes.append((node.thenBranch, True))
+            if node.elseBranch is not None:
+                nodes.append((node.elseBranch, True))
+        elif isinstance(node, While):
+            # OP_JUMP_IF_FALSE and OP_LOOP
+            count += 2 - fused_condition(node.condition)
+            nodes.append((node.condition, False))
+            nodes.append((node.body, True))
+        else:
+            # expression statements end with OP_POP
+            count += isStatement
+            if isinstance(node, Binary):
+                count += 1
+                nodes.append((node.left, False))
+                nodes.append((node.right, False))
+            elif isinstance(node, (Unary, Assign)):
+                count += 1
+                nodes.append((node.right if isinstance(node, Unary) else node.value, False))
+            elif isinstance(node, Grouping):
+                nodes.append((node.expression, False))
+            else:
+                count += 1
+    return count
+
+
+# globals a statement declares or assigns, added to names
+def assigned_names(node, names):
+    if isinstance(node, Block):
+        for declaration in node.declarations:
+            assigned_names(declaration, names)
+    elif isinstance(node, If):
+        assigned_names(node.condition, names)
+        assigned_names(node.thenBranch, names)
+        if node.elseBranch is not None:
+            assigned_names(node.elseBranch, names)
+    elif isinstance(node, While):
+        assigned_names(node.condition, names)
+        assigned_names(node.body, names)
+    elif isinstance(node, VarDecl):
+        names.add(node.name.lexeme)
+        if node.initializer is not None:
+            assigned_names(node.initializer, names)
+    elif isinstance(node, (Print, Grouping)):
+        assigned_names(node.expression, names)
+    elif isinstance(node, Assign):
+        names.add(node.name.lexeme)
+        assigned_names(node.value, names)
+    elif isinstance(node, Binary):
+        assigned_names(node.left, names)
+        assigned_names(node.right, names)
+    elif isinstance(node, Unary):
+        assigned_names(node.right, names)
+
+
+def has_declaration(node):
+    if isinstance(node, VarDecl):
+        return True
+    if isinstance(node, Block):
+        return any(has_declaration(declaration) for declaration in node.declarations)
+    if isinstance(node, If):
+        return has_declaration(node.thenBranch) or \
+            (node.elseBranch is not None and has_declaration(node.elseBranch))
+    if isinstance(node, While):
+        return has_declaration(node.body)
+    return False
+
+
+def has_assignment(node):
+    if isinstance(node, Assign):
+        return True
+    if isinstance(node, Binary):
+        return has_assignment(node.left) or has_assignment(node.right)
+    if isinstance(node, Unary):
+        return has_assignment(node.right)
+    if isinstance(node, Grouping):
+        return has_assignment(node.expression)
+    return False
+
+
+# structural key and instruction count of an expression that assigns
+# nothing, adding the globals it reads to reads; None otherwise
+def pure_key(node, reads):
+    if isinstance(node, Literal):
+        return ("literal",) + literal_key(node.value), 1
+    if isinstance(node, Variable):
+        reads.add(node.name.lexeme)
+        return ("variable", node.name.lexeme), 1
+    if isinstance(node, Grouping):
+        return pure_key(node.expression, reads)
+    if isinstance(node, Binary):
+        left = pure_key(node.left, reads)
+        right = pure_key(node.right, reads)
+        if left is None or right is None:
+            return None
+        return (node.operator.type, left[0], right[0]), 1 + left[1] + right[1]
+    if isinstance(node, Unary):
+        right = pure_key(node.right, reads)
+        if right is None:
+            return None
+        return (node.operator.type, right[0]), 1 + right[1]
+    return None
+
+
+class Compiler:
+    def __init__(self, optimize=True, memoize=False, vm=None):
+        self.vm = VirtualMachine() if vm is None else vm
+        # compiling into an existing machine: its code and its host read
+        # globals the statements compiled here do not
+        self.extending = vm is not None
+        self.optimize = optimize
+        self.memoize = memoize
+        self.constantIndex = {}
+        self.memoSlots = {}
+        self.temps = 0
+        self.hoists = 0
+        self.numericGlobals = set()
+        self.hoisting = False
+        self.report = {
+            "instructions_before": 0,
+            "instructions_after": 0,
+            "saved": 0,
+            "folded": 0,
+            "simplified": 0,
+            "dead_stores": 0,
+            "hoisted": 0,
+            "cse_temps": 0,
+            "cse_reuses": 0,
+            "constants_shared": 0,
+            "memoized": 0,
+            "memo_slots": 0,
+        }
+
+    def compile(self, statements):
+        if statements is None:
+            raise Exception("Nothing to compile")
+        # the unoptimized chunk: every statement as written plus OP_RETURN
+        self.report["instructions_before"] = count_instructions(statements) + 1
+        if self.optimize:
+            self.numericGlobals = self.numeric_globals(statements)
+            statements = [self.simplify_statement(statement) for statement in statements]
+            if not self.extending:
+                statements = self.eliminate_dead_stores(statements)
+            statements = [self.hoist_statement(statement) for statement in statements]
+            statements = self.eliminate_common_subexpressions(statements)
+        for statement in statements:
+            self.statement(statement)
+        self.vm.write_chunk(OpCode.OP_RETURN)
+        self.report["instructions_after"] = self.vm.instruction_count()
+        self.report["saved"] = self.report["instructions_before"] - self.report["instructions_after"]
+        return self.vm
+
+    def print_report(self):
+        report = self.report
+        print(f"Instructions: {report['instructions_before']} -> {report['instructions_after']} (saved {report['saved']})")
+        print("Report:", report)
+
+    # ---- simplify ----
+
+    # globals declared by a top-level var here and assigned only numbers
+    # anywhere in the program (an uninitialized var holds 0); a var nested in
+    # a branch may never run, and globals of the machine compiled into can
+    # hold anything
+    def numeric_globals(self, statements):
+        stores = []
+        nodes = list(statements)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, Block):
+                nodes.extend(node.declarations)
+            elif isinstance(node, If):
+                nodes.extend((node.condition, node.thenBranch))
+                if node.elseBranch is not None:
+                    nodes.append(node.elseBranch)
+            elif isinstance(node, While):
+                nodes.extend((node.condition, node.body))
+            elif isinstance(node, (Print, Grouping)):
+                nodes.append(node.expression)
+            elif isinstance(node, VarDecl):
+                stores.append((node.name.lexeme, node.initializer))
+                if node.initializer is not None:
+                    nodes.append(node.initializer)
+            elif isinstance(node, Assign):
+                stores.append((node.name.lexeme, node.value))
+                nodes.append(node.value)
+            elif isinstance(node, Binary):
+                nodes.extend((node.left, node.right))
+            elif isinstance(node, Unary):
+                nodes.append(node.right)
+        self.numericGlobals = {node.name.lexeme for node in statements
+                               if isinstance(node, VarDecl) and self.vm.variablesIndex(node.name.lexeme) == -1}
+        changed = True
+        while changed:
+            changed = False
+            for name, value in stores:
+                if name in self.numericGlobals and value is not None and not self.numeric(value):
+                    self.numericGlobals.discard(name)
+                    changed = True
+        return self.numericGlobals
+
+    # the expression evaluates to a number, if it does not raise
+    def numeric(self, node):
+        if isinstance(node, Literal):
+            return is_number(node.value)
+        if isinstance(node, Variable):
+            return node.name.lexeme in self.numericGlobals
+        if isinstance(node, Grouping):
+            return self.numeric(node.expression)
+        if isinstance(node, Assign):
+            return self.numeric(node.value)
+        if isinstance(node, Unary):
+            return node.operator.type == TokenType.BANG or self.numeric(node.right)
+        if isinstance(node, Binary):
+            return node.operator.type in COMPARISON_TOKENS or (self.numeric(node.left) and self.numeric(node.right))
+        return False
+
+    def simplify_statement(self, node):
+        if isinstance(node, Block):
+            return Block([self.simplify_statement(declaration) for declaration in node.declarations])
+        if isinstance(node, Print):
+            return Print(self.simplify(node.expression))
+        if isinstance(node, VarDecl):
+            if node.initializer is None:
+                return node
+            return VarDecl(node.name, self.simplify(node.initializer))
+        if isinstance(node, If):
+            condition = self.simplify(node.condition)
+            thenBranch = self.simplify_statement(node.thenBranch)
+            elseBranch = None if node.elseBranch is None else self.simplify_statement(node.elseBranch)
+            if isinstance(condition, Literal) and is_number(condition.value):
+                taken, dropped = (thenBranch, elseBranch) if condition.value else (elseBranch, thenBranch)
+                if dropped is None or not has_declaration(dropped):
+                    self.report["simplified"] += 1
+                    return taken if taken is not None else Block([])
+            return If(condition, thenBranch, elseBranch)
+        if isinstance(node, While):
+            condition = self.simplify(node.condition)
+            body = self.simplify_statement(node.body)
+            if isinstance(condition, Literal) and is_number(condition.value) \
+                    and not condition.value and not has_declaration(body):
+                self.report["simplified"] += 1
+                return Block([])
+            return While(condition, body)
+        return self.simplify(node)
+
+    def simplify(self, node):
+        if isinstance(node, Grouping):
+            return self.simplify(node.expression)
+        if isinstance(node, Assign):
+            return Assign(node.name, self.simplify(node.value))
+        if isinstance(node, Unary):
+            right = self.simplify(node.right)
+            if node.operator.type == TokenType.MINUS:
+                if isinstance(right, Literal) and is_number(right.value):
+                    self.report["folded"] += 1
+                    return Literal(-right.value)
+                if isinstance(right, Unary) and right.operator.type == TokenType.MINUS \
+                        and self.numeric(right.right):
+                    self.report["simplified"] += 1
+                    return right.right
+            elif node.operator.type == TokenType.BANG:
+                if isinstance(right, Literal) and is_number(right.value):
+                    self.report["folded"] += 1
+                    return Literal(0 if right.value else 1)
+            return Unary(node.operator, right)
+        if isinstance(node, Binary):
+            left = self.simplify(node.left)
+            right = self.simplify(node.right)
+            type = node.operator.type
+            if isinstance(left, Literal) and isinstance(right, Literal) \
+                    and is_number(left.value) and is_number(right.value):
+                value = fold(type, left.value, right.value)
+                if value is not None:
+                    self.report["folded"] += 1
+                    return Literal(value)
+            if ((type == TokenType.PLUS and is_int_literal(right, 0))
+                    or (type == TokenType.MINUS and is_int_literal(right, 0))
+                    or (type == TokenType.STAR and is_int_literal(right, 1))
+                    or (type == TokenType.CARET and is_int_literal(right, 1))) and self.numeric(left):
+                self.report["simplified"] += 1
+                return left
+            if ((type == TokenType.PLUS and is_int_literal(left, 0))
+                    or (type == TokenType.STAR and is_int_literal(left, 1))) and self.numeric(right):
+                self.report["simplified"] += 1
+                return right
+            return Binary(left, node.operator, right)
+        return node
+
+    # ---- dead stores ----
+
+    def eliminate_dead_stores(self, statements):
+        while True:
+            reads = set()
+            for statement in statements:
+                self.collect_reads(statement, reads)
+            removed = self.report["dead_stores"]
+            statements = self.remove_stores(statements, reads)
+            if self.report["dead_stores"] == removed:
+                return statements
+
+    def collect_reads(self, node, reads):
+        if isinstance(node, Variable):
+            reads.add(node.name.lexeme)
+        elif isinstance(node, Block):
+            for declaration in node.declarations:
+                self.collect_reads(declaration, reads)
+        elif isinstance(node, If):
+            self.collect_reads(node.condition, reads)
+            self.collect_reads(node.thenBranch, reads)
+            if node.elseBranch is not None:
+                self.collect_reads(node.elseBranch, reads)
+        elif isinstance(node, While):
+            self.collect_reads(node.condition, reads)
+            self.collect_reads(node.body, reads)
+        elif isinstance(node, (Print, Grouping)):
+            self.collect_reads(node.expression, reads)
+        elif isinstance(node, VarDecl):
+            if node.initializer is not None:
+                self.collect_reads(node.initializer, reads)
+        elif isinstance(node, Assign):
+            self.collect_reads(node.value, reads)
+        elif isinstance(node, Binary):
+            self.collect_reads(node.left, reads)
+            self.collect_reads(node.right, reads)
+        elif isinstance(node, Unary):
+            self.collect_reads(node.right, reads)
+
+    def remove_stores(self, statements, reads):
+        result = []
+        for node in statements:
+            if isinstance(node, Block):
+                result.append(Block(self.remove_stores(node.declarations, reads)))
+            elif isinstance(node, If):
+                elseBranch = None if node.elseBranch is None else self.remove_branch(node.elseBranch, reads)
+                result.append(If(self.remove_assignments(node.condition, reads),
+                                 self.remove_branch(node.thenBranch, reads), elseBranch))
+            elif isinstance(node, While):
+                result.append(While(self.remove_assignments(node.condition, reads),
+                                    self.remove_branch(node.body, reads)))
+            elif isinstance(node, VarDecl) and node.name.lexeme not in reads:
+                self.report["dead_stores"] += 1
+                # keep the initializer when it assigns or could raise
+                if node.initializer is not None and (has_assignment(node.initializer)
+                                                     or not cannot_raise(node.initializer, self.numeric)):
+                    result.append(self.remove_assignments(node.initializer, reads))
+            elif isinstance(node, VarDecl):
+                if node.initializer is None:
+                    result.append(node)
+                else:
+                    result.append(VarDecl(node.name, self.remove_assignments(node.initializer, reads)))
+            elif isinstance(node, Print):
+                result.append(Print(self.remove_assignments(node.expression, reads)))
+            else:
+                result.append(self.remove_assignments(node, reads))
+        return result
+
+    def remove_branch(self, node, reads):
+        statements = self.remove_stores([node], reads)
+        return statements[0] if len(statements) == 1 else Block(statements)
+
+    def remove_assignments(self, node, reads):
+        if isinstance(node, Assign):
+            value = self.remove_assignments(node.value, reads)
+            if node.name.lexeme not in reads:
+                self.report["dead_stores"] += 1
+                return value
+            return Assign(node.name, value)
+        if isinstance(node, Binary):
+            return Binary(self.remove_assignments(node.left, reads), node.operator,
+                          self.remove_assignments(node.right, reads))
+        if isinstance(node, Unary):
+            return Unary(node.operator, self.remove_assignments(node.right, reads))
+        return node
+
+    # ---- loop invariants ----
+
+    # inner loops first, so their prologues are plain code of the outer body
+    def hoist_statement(self, node):
+        if isinstance(node, Block):
+            return Block([self.hoist_statement(declaration) for declaration in node.declarations])
+        if isinstance(node, If):
+            elseBranch = None if node.elseBranch is None else self.hoist_statement(node.elseBranch)
+            return If(node.condition, self.hoist_statement(node.thenBranch), elseBranch)
+        if isinstance(node, While):
+            return self.hoist_loop(While(node.condition, self.hoist_statement(node.body)))
+        return node
+
+    # while c do body  ->  if c then begin $h0 = ...; while c' do body' end
+    def hoist_loop(self, node):
+        # the condition is evaluated once more by the guard
+        if has_assignment(node.condition):
+            return node
+        assigned = set()
+        assigned_names(node.body, assigned)
+        hoisted = {}
+        self.hoisting = True
+        condition = self.hoist_top(node.condition, assigned, hoisted)
+        body = self.hoist_body(node.body, assigned, hoisted)
+        if not hoisted:
+            return node
+        prologue = [Assign(Token(TokenType.IDENTIFIER, name, name, 0), expression)
+                    for name, expression in hoisted.values()]
+        self.report["hoisted"] += len(prologue)
+        return If(node.condition, Block(prologue + [While(condition, body)]), None)
+
+    # statements run on every iteration (branches and inner loops are not),
+    # until the first one that prints or stores: self.hoisting is cleared
+    # there, and the expression it evaluates before doing so is the last one
+    # taking part
+    def hoist_body(self, node, assigned, hoisted):
+        if not self.hoisting:
+            return node
+        if isinstance(node, Block):
+            return Block([self.hoist_body(declaration, assigned, hoisted) for declaration in node.declarations])
+        if isinstance(node, If):
+            self.hoisting = False
+            if has_assignment(node.condition):
+                return node
+            return If(self.hoist_top(node.condition, assigned, hoisted), node.thenBranch, node.elseBranch)
+        if isinstance(node, While):
+            self.hoisting = False
+            return node
+        if isinstance(node, Print):
+            self.hoisting = False
+            if has_assignment(node.expression):
+                return node
+            return Print(self.hoist_top(node.expression, assigned, hoisted))
+        if isinstance(node, VarDecl):
+            self.hoisting = False
+            if node.initializer is None or has_assignment(node.initializer):
+                return node
+            return VarDecl(node.name, self.hoist_top(node.initializer, assigned, hoisted))
+        if isinstance(node, Assign):
+            self.hoisting = False
+            if has_assignment(node.value):
+                return node
+            return Assign(node.name, self.hoist_top(node.value, assigned, hoisted))
+        if has_assignment(node):
+            self.hoisting = False
+            return node
+        return self.hoist_top(node, assigned, hoisted)
+
+    def hoist_top(self, node, assigned, hoisted):
+        node, key = self.hoist(node, assigned, hoisted)
+        return self.hoisted(node, key, hoisted)
+
+    # rewrites node and returns it with its key when it is loop invariant
+    def hoist(self, node, assigned, hoisted):
+        if isinstance(node, Literal):
+            return node, ("literal",) + literal_key(node.value)
+        if isinstance(node, Variable):
+            name = node.name.lexeme
+            return node, None if name in assigned else ("variable", name)
+        if isinstance(node, Grouping):
+            return self.hoist(node.expression, assigned, hoisted)
+        if isinstance(node, Assign):
+            return Assign(node.name, self.hoist_top(node.value, assigned, hoisted)), None
+        if isinstance(node, Binary):
+            left, leftKey = self.hoist(node.left, assigned, hoisted)
+            right, rightKey = self.hoist(node.right, assigned, hoisted)
+            if leftKey is not None and rightKey is not None:
+                return Binary(left, node.operator, right), (node.operator.type, leftKey, rightKey)
+            return Binary(self.hoisted(left, leftKey, hoisted), node.operator,
+                          self.hoisted(right, rightKey, hoisted)), None
+        if isinstance(node, Unary):
+            right, key = self.hoist(node.right, assigned, hoisted)
+            if key is not None:
+                return Unary(node.operator, right), (node.operator.type, key)
+            return Unary(node.operator, self.hoisted(right, key, hoisted)), None
+        return node, None
+
+    # an invariant operation is replaced by a read of its $h global
+    def hoisted(self, node, key, hoisted):
+        if key is None or not isinstance(node, (Binary, Unary)):
+            return node
+        entry = hoisted.get(key)
+        if entry is None:
+            name = "$h" + str(self.hoists)
+            self.hoists += 1
+            entry = hoisted[key] = (name, node)
+        return Variable(Token(TokenType.IDENTIFIER, entry[0], entry[0], 0))
+
+    # ---- common subexpressions ----
+
+    def eliminate_common_subexpressions(self, statements):
+        self.keys = {}
+        self.costs = {}
+        self.counts = {}
+        self.versions = {}
+        for statement in statements:
+            self.number_statement(statement)
+        self.stored = {}
+        statements = [self.reuse_statement(statement) for statement in statements]
+        del self.keys, self.costs, self.counts, self.versions, self.stored
+        return statements
+
+    # walks in evaluation order; gives each pure expression a key made of its
+    # operators, literals and the version of every global it reads
+    def number_statement(self, node):
+        if isinstance(node, Block):
+            for declaration in node.declarations:
+                self.number_statement(declaration)
+        elif isinstance(node, Print):
+            self.number(node.expression)
+        elif isinstance(node, VarDecl):
+            if node.initializer is not None:
+                self.number(node.initializer)
+            self.bump(node.name.lexeme)
+        elif isinstance(node, If):
+            self.number(node.condition)
+            self.barrier(node.thenBranch)
+            if node.elseBranch is not None:
+                self.barrier(node.elseBranch)
+        elif isinstance(node, While):
+            self.barrier(node)
+        else:
+            self.number(node)
+
+    def bump(self, name):
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+    # code that may run any number of times is left out of the numbering;
+    # everything it assigns gets a new version
+    def barrier(self, node):
+        names = set()
+        assigned_names(node, names)
+        for name in names:
+            self.bump(name)
+
+    def number(self, node):
+        if isinstance(node, Literal):
+            value = node.value
+            return ("literal",) + literal_key(value)
+        if isinstance(node, Variable):
+            name = node.name.lexeme
+            return ("variable", name, self.versions.get(name, 0))
+        if isinstance(node, Assign):
+            self.number(node.value)
+            self.bump(node.name.lexeme)
+            return None
+        if isinstance(node, Grouping):
+            return self.number(node.expression)
+        if isinstance(node, Binary):
+            left = self.number(node.left)
+            right = self.number(node.right)
+            if left is None or right is None:
+                return None
+            key = (node.operator.type, left, right)
+            cost = 1 + self.costs.get(left, 1) + self.costs.get(right, 1)
+        elif isinstance(node, Unary):
+            right = self.number(node.right)
+            if right is None:
+                return None
+            key = (node.operator.type, right)
+            cost = 1 + self.costs.get(right, 1)
+        else:
+            return None
+        self.keys[id(node)] = key
+        self.costs[key] = cost
+        self.counts[key] = self.counts.get(key, 0) + 1
+        return key
+
+    def reuse_statement(self, node):
+        if isinstance(node, Block):
+            return Block([self.reuse_statement(declaration) for declaration in node.declarations])
+        if isinstance(node, Print):
+            return Print(self.reuse(node.expression))
+        if isinstance(node, VarDecl):
+            if node.initializer is None:
+                return node
+            return VarDecl(node.name, self.reuse(node.initializer))
+        if isinstance(node, If):
+            return If(self.reuse(node.condition), node.thenBranch, node.elseBranch)
+        if isinstance(node, While):
+            return node
+        return self.reuse(node)
+
+    def reuse(self, node):
+        key = self.keys.get(id(node))
+        if key is not None:
+            name = self.stored.get(key)
+            if name is not None:
+                self.report["cse_reuses"] += 1
+                return Variable(Token(TokenType.IDENTIFIER, name, name, 0))
+            count = self.counts[key]
+            # storing costs one OP_SET_GLOBAL, each later use saves cost - 1
+            if count >= 2 and (count - 1) * (self.costs[key] - 1) > 1:
+                name = "$t" + str(self.temps)
+                self.temps += 1
+                self.report["cse_temps"] += 1
+                self.stored[key] = name
+                # the other occurrences are replaced whole, their parts vanish
+                self.discount(node, count - 1)
+                return Assign(Token(TokenType.IDENTIFIER, name, name, 0), self.rebuild(node))
+        return self.rebuild(node)
+
+    def rebuild(self, node):
+        if isinstance(node, Binary):
+            left = self.reuse(node.left)
+            return Binary(left, node.operator, self.reuse(node.right))
+        if isinstance(node, Unary):
+            return Unary(node.operator, self.reuse(node.right))
+        if isinstance(node, Assign):
+            return Assign(node.name, self.reuse(node.value))
+        return node
+
+    def discount(self, node, count):
+        for child in (node.left, node.right) if isinstance(node, Binary) else (node.right,):
+            key = self.keys.get(id(child))
+            if key is not None:
+                self.counts[key] -= count
+                self.discount(child, count)
+
+    # ---- emission ----
+
+    def statement(self, node):
+        if isinstance(node, Block):
+            for declaration in node.declarations:
+                self.statement(declaration)
+        elif isinstance(node, Print):
+            self.memoized(node.expression)
+            self.vm.write_chunk(OpCode.OP_PRINT)
+        elif isinstance(node, VarDecl):
+            if node.initializer is None:
+                self.vm.write_chunk(OpCode.OP_NIL)
+            else:
+                self.memoized(node.initializer)
+            self.vm.write_chunk(OpCode.OP_SET_GLOBAL, self.global_slot(node.name.lexeme, True))
+            self.vm.write_chunk(OpCode.OP_POP)
+        elif isinstance(node, If):
+            thenJump = self.condition_jump(node.condition)
+            self.statement(node.thenBranch)
+            if node.elseBranch is not None:
+                elseJump = self.jump(OpCode.OP_JUMP)
+                self.patch(thenJump)
+                self.statement(node.elseBranch)
+                self.patch(elseJump)
+            else:
+                self.patch(thenJump)
+        elif isinstance(node, While):
+            loopStart = len(self.vm.bytecode)
+            exitJump = self.condition_jump(node.condition)
+            self.statement(node.body)
+            self.vm.write_chunk(OpCode.OP_LOOP, len(self.vm.bytecode) + 2 - loopStart)
+            self.patch(exitJump)
+        else:
+            self.memoized(node)
+            self.vm.write_chunk(OpCode.OP_POP)
+
+    # jump taken when the condition is false, fused with a final comparison
+    def condition_jump(self, node):
+        if fused_condition(node):
+            while isinstance(node, Grouping):
+                node = node.expression
+            self.expression(node.left)
+            self.expression(node.right)
+            return self.jump(OpCode.OP_COMPARE_JUMP, BINARY_OPCODES[node.operator.type])
+        self.expression(node)
+        return self.jump(OpCode.OP_JUMP_IF_FALSE)
+
+    def jump(self, opcode, operand=None):
+        self.vm.write_chunk(opcode, operand)
+        self.vm.write_chunk(0)
+        return len(self.vm.bytecode) - 1
+
+    def patch(self, at):
+        self.vm.bytecode[at] = len(self.vm.bytecode) - at - 1
+
+    def memoized(self, node):
+        reads = set()
+        pure = pure_key(node, reads) if self.memoize else None
+        if pure is None or pure[1] < MEMO_MIN_COST:
+            self.expression(node)
+            return
+        slot = self.memoSlots.get(pure[0])
+        if slot is None:
+            for name in reads:
+                self.global_slot(name, False)
+            slot = self.memoSlots[pure[0]] = self.vm.addMemo(sorted(reads))
+            self.report["memo_slots"] += 1
+        self.report["memoized"] += 1
+        self.vm.write_chunk(OpCode.OP_MEMO, slot)
+        self.vm.write_chunk(0)
+        # read after the first write, which gives a fork its own copy
+        start = len(self.vm.bytecode)
+        self.expression(node)
+        self.vm.write_chunk(OpCode.OP_MEMO_STORE, slot)
+        self.vm.bytecode[start - 1] = len(self.vm.bytecode) - start
+
+    def expression(self, node):
+        if isinstance(node, Literal):
+            self.vm.write_chunk(OpCode.OP_CONSTANT, self.constant(node.value))
+        elif isinstance(node, Variable):
+            self.vm.write_chunk(OpCode.OP_GET_GLOBAL, self.global_slot(node.name.lexeme, False))
+        elif isinstance(node, Assign):
+            self.expression(node.value)
+            name = node.name.lexeme
+            self.vm.write_chunk(OpCode.OP_SET_GLOBAL, self.global_slot(name, name.startswith("$")))
+        elif isinstance(node, Grouping):
+            self.expression(node.expression)
+        elif isinstance(node, Binary):
+            opcode = BINARY_OPCODES.get(node.operator.type)
+            if opcode is None:
+                raise Exception("Unsupported operator: " + node.operator.lexeme)
+            self.expression(node.left)
+            self.expression(node.right)
+            self.vm.write_chunk(opcode)
+        elif isinstance(node, Unary):
+            if node.operator.type == TokenType.MINUS:
+                opcode = OpCode.OP_NEGATE
+            elif node.operator.type == TokenType.BANG:
+                opcode = OpCode.OP_NOT
+            else:
+                raise Exception("Unsupported operator: " + node.operator.lexeme)
+            self.expression(node.right)
+            self.vm.write_chunk(opcode)
+        else:
+            raise Exception("Unknown expression: " + str(node))
+
+    def global_slot(self, name, declare):
+        index = self.vm.variablesIndex(name)
+        if index == -1:
+            if not declare:
+                raise Exception("Undefined variable '" + name + "'")
+            index = self.vm.declareGlobal(name)
+        return index
+
+    def constant(self, value):
+        key = literal_key(value)
+        index = self.constantIndex.get(key)
+        if index is None:
+            index = self.constantIndex[key] = self.vm.add_constant(value)
+        else:
+            self.report["constants_shared"] += 1
+        return index
+
@@ -0,0 +1,110 @@
+import random
+
+
+# Seeded generator of valid programs for stress tests and benchmarks. The
+# same parameters and seed always produce the same source.
+#
+#   statements   statements after the declarations
+#   globals      numeric globals declared up front (plus a few strings)
+#   depth        operators in each generated expression; parentheses,
+#                prefix '-' and right-associative '^' chains nest with it
+#   literals     size of the pool numeric literals are drawn from, smaller
+#                means more repetition of the same constants
+#   stringSize   length of generated string literals
+#   control      fraction of statements that are if / while statements;
+#                each loop counts a global of its own (c0, c1, ...) up to
+#   iterations   the number of times every generated loop runs
+#
+# Programs never divide by a non-literal, only raise to the power 1, and
+# reduce products and assigned values modulo a prime, so they run to
+# completion at any size without overflow or errors.
+class ProgramGenerator:
+    def __init__(self, seed=0, statements=100, globals=10, depth=4, literals=32, stringSize=8,
+                 control=0.0, iterations=10):
+        self.random = random.Random(seed)
+        self.statements = statements
+        self.globals = max(1, globals)
+        self.depth = max(1, depth)
+        self.literals = [self.random.randint(1, 999) for _ in range(max(1, literals))]
+        self.stringSize = stringSize
+        self.strings = max(1, self.globals // 10)
+        self.control = control
+        self.iterations = iterations
+        self.loops = 0
+
+    def generate(self):
+        lines = []
+        for index in range(self.globals):
+            lines.append(f"var g{index} = {self.literal()};")
+        for index in range(self.strings):
+            lines.append(f'var s{index} = "{self.string()}";')
+        statements = [self.statement() for _ in range(self.statements)]
+        for index in range(self.loops):
+            lines.append(f"var c{index} = 0;")
+        return "\n".join(lines + statements) + "\n"
+
+    def statement(self):
+        # no extra draw without control, so existing seeds keep their programs
+        if self.control and self.random.random() < self.control:
+            return self.control_statement()
+        return self.simple_statement()
+
+    def control_statement(self):
+        comparison = self.random.choice(("<", "<=", ">", ">=", "==", "!="))
+        if self.random.random() < 0.5:
+            return (f"if {self.expression(self.depth)} {comparison} {self.operand()} "
+                    f"then {self.simple_statement()} else {self.simple_statement()}")
+        counter = f"c{self.loops}"
+        self.loops += 1
+        body = " ".join(self.simple_statement() for _ in range(self.random.randint(1, 3)))
+        return (f"{counter} = 0; while {counter} < {self.iterations} do begin "
+                f"{body} {counter} = {counter} + 1; end")
+
+    def simple_statement(self):
+        choice = self.random.random()
+        if choice < 0.4:
+            return f"print({self.expression(self.depth)});"
+        if choice < 0.8:
+            return f"{self.variable()} = ({self.expression(self.depth)}) % 997;"
+        if choice < 0.9:
+            return f'print(s{self.random.randrange(self.strings)} + "{self.string()}");'
+        return f"{self.expression(self.depth)};"
+
+    # built iteratively so deep expressions do not recurse here
+    def expression(self, depth):
+        text = self.operand()
+        for _ in range(depth - 1):
+            choice = self.random.random()
+            if choice < 0.15:
+                text = f"({text})"
+            elif choice < 0.25:
+                text = f"-{text}"
+            elif choice < 0.35:
+                # extends a right-associative chain: x ^ 1 ^ 1 ...
+                text = f"{text} ^ 1"
+            elif choice < 0.5:
+                text = f"{self.operand()} * ({text}) % 997"
+            else:
+                operator = self.random.choice(("+", "-", "*", "/", "%"))
+                if operator in ("/", "%"):
+                    text = f"{text} {operator} {self.literal()}"
+                else:
+                    text = f"{text} {operator} {self.operand()}"
+        return text
+
+    def operand(self):
+        if self.random.random() < 0.5:
+            return self.variable()
+        return self.literal()
+
+    def variable(self):
+        return f"g{self.random.randrange(self.globals)}"
+
+    def literal(self):
+        value = self.random.choice(self.literals)
+        if value % 5 == 0:
+            return f"{value}.5"
+        return str(value)
+
+    def string(self):
+        return "".join(self.random.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(self.stringSize))
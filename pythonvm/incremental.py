@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right
+
+from .lexer import Lexer
+from .parser import Parser
+from .tokens import TokenType
+from .vm import OpCode, VirtualMachine
+from .compiler import literal_key
+
+
+# Incremental compilation for REPLs and live editing. The chunk is built with
+# the single pass Parser, one top-level statement at a time, and for every
+# statement the source span and the bytecode range it compiled to are kept in
+# parallel arrays:
+#
+#   starts / ends      [start, end) of the statement in the source
+#   codeStarts         first bytecode slot of its code
+#
+# An edit re-lexes and re-parses only the statements it touches together with
+# the whitespace and comments around them; when that region does not parse on
+# its own (a ';' was deleted, a comment was opened) or the full lexer would
+# not be back in code at its end (a '#' comment runs on past it) it grows on
+# each side by one statement, then two, four... until it does. The new code replaces the
+# old range of the bytecode list in place; the code of every other statement
+# is left as it is.
+# Jumps in the bytecode are relative, so shifting code does not break them.
+#
+# Constant and global slots never move: constants are shared by value, so
+# recompiling a statement reuses its slots, and globals keep their slot for
+# the life of the chunk. Constants only used by deleted code stay in the pool.
+# A slot outliving its declaration must not make code compile that a full
+# compile rejects, so each statement also records the global it declares
+# and the globals it names:
+#
+#   declares           name after 'var', or None
+#   uses               other identifiers of the statement
+#
+# and an edit is rejected ("Undefined variable") when a global it declared,
+# removed or named has a use with no declaration before it.
+#
+# A rejected edit still takes the new text, as the editor already has it:
+# the session is dirty, run() refuses to run, and the next edit or update
+# recompiles the whole source.
+#
+#   live = IncrementalCompiler("var x = 1;\nprint(x + 1);\n")
+#   live.run()
+#   live.update("var x = 2;\nprint(x + 1);\n")   # recompiles the first line
+
+
+def is_word(char):
+    return char.isalnum() or char == '_' or char == '.'
+
+
+# appended to a region that ends before the source does: the lexer only turns
+# it into a token when the region ends outside any comment
+SENTINEL = " ;"
+
+
+# length of the longest common prefix / suffix, compared slice-wise so the
+# work happens in C rather than one character at a time
+def common_prefix(a, b):
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# Parser emitting into a shared machine, with constants shared by value so a
+# recompiled statement gets back the slots it had
+class StatementParser(Parser):
+    def __init__(self, tokens, vm, constantIndex):
+        super().__init__(tokens, vm)
+        self.constantIndex = constantIndex
+
+    def emitConstant(self, value):
+        key = literal_key(value)
+        index = self.constantIndex.get(key)
+        if index is None:
+            index = self.constantIndex[key] = self.vm.add_constant(value)
+        self.emitBytes(OpCode.OP_CONSTANT, index)
+
+
+class IncrementalCompiler:
+    def __init__(self, source=""):
+        self.vm = VirtualMachine()
+        self.vm.write_chunk(OpCode.OP_RETURN)
+        self.source = ""
+        self.constantIndex = {}
+        self.starts = []
+        self.ends = []
+        self.codeStarts = []
+        self.declares = []
+        self.uses = []
+        self.error = None           # why the current source did not compile
+        self.report = {
+            "edits": 0,
+            "recompiled": 0,
+            "kept": 0,
+            "relexed_chars": 0,
+            "retries": 0,
+        }
+        if source:
+            self.edit(0, 0, source)
+
+    # replaces the whole source, recompiling the part that changed
+    def update(self, source):
+        old = self.source
+        if source == old:
+            return self.vm
+        prefix = common_prefix(old, source)
+        suffix = common_suffix(old, source, min(len(old), len(source)) - prefix)
+        return self.edit(prefix, len(old) - suffix, source[prefix:len(source) - suffix])
+
+    # replaces source[start:end] with text, as an editor change event would
+    def edit(self, start, end, text):
+        old = self.source
+        if not 0 <= start <= end <= len(old):
+            raise Exception(f"Edit {start}:{end} outside of the source")
+        source = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        count = len(self.starts)
+        # statements touching the edit, their neighbours' ends bound the region
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if self.error is not None:
+            # the statements no longer match the source: compile all of it
+            first, last, delta = 0, count, len(source) - len(old)
+        self.source = source
+        self.error = None
+        grow = 1
+        try:
+            while True:
+                regionStart = self.ends[first - 1] if first > 0 else 0
+                regionEnd = (self.starts[last] if last < count else len(old)) + delta
+                try:
+                    spans, code, statements = self.compile_region(source, regionStart, regionEnd)
+                    break
+                except Exception:
+                    if first == 0 and last == count:
+                        raise
+                    self.report["retries"] += 1
+                    first = max(0, first - grow)
+                    last = min(count, last + grow)
+                    grow *= 2
+            names = {name for name in self.declares[first:last] if name is not None}
+            self.splice(first, last, spans, code, delta, statements)
+            for declares, uses in statements:
+                names |= uses
+                if declares is not None:
+                    names.add(declares)
+            self.check_declarations(names)
+        except Exception as e:
+            self.error = str(e)
+            raise
+        self.report["edits"] += 1
+        self.report["recompiled"] += len(spans)
+        self.report["kept"] += len(self.starts) - len(spans)
+        return self.vm
+
+    def compile_region(self, source, regionStart, regionEnd):
+        # a region must not cut a word the full lexer would read as one token
+        if (regionStart > 0 and regionStart < len(source) and is_word(source[regionStart - 1])
+                and is_word(source[regionStart])) or \
+                (0 < regionEnd < len(source) and is_word(source[regionEnd - 1]) and is_word(source[regionEnd])):
+            raise Exception("Region boundary inside a word")
+        self.report["relexed_chars"] += regionEnd - regionStart
+        text = source[regionStart:regionEnd]
+        bounded = regionEnd < len(source)
+        lexer = Lexer(text + SENTINEL if bounded else text)
+        lexer.line = source.count("\n", 0, regionStart) + 1
+        tokens = lexer.tokenize()
+        if bounded:
+            sentinel = tokens[-2] if len(tokens) > 1 else None
+            if sentinel is None or sentinel.type != TokenType.SEMICOLON or sentinel.offset != len(text) + 1:
+                raise Exception("Region ends inside a comment")
+            del tokens[-2]
+        vm = self.vm
+        bytecode = vm.bytecode
+        vm.bytecode = []
+        try:
+            parser = StatementParser(tokens, vm, self.constantIndex)
+            spans = []
+            statements = []
+            while not parser.is_at_end():
+                first = parser.current
+                begin = tokens[first]
+                mark = len(vm.bytecode)
+                parser.declaration()
+                final = tokens[parser.current - 1]
+                spans.append((regionStart + begin.offset,
+                              regionStart + final.offset + len(final.lexeme), mark))
+                declares = tokens[first + 1].lexeme if begin.type == TokenType.VAR else None
+                named = tokens[first + 2 if declares is not None else first:parser.current]
+                statements.append((declares, {token.lexeme for token in named
+                                              if token.type == TokenType.IDENTIFIER}))
+            return spans, vm.bytecode, statements
+        finally:
+            vm.bytecode = bytecode
+
+    def splice(self, first, last, spans, code, delta, statements):
+        bytecode = self.vm.bytecode
+        count = len(self.starts)
+        # the final OP_RETURN stays last
+        codeStart = self.codeStarts[first] if first < count else len(bytecode) - 1
+        codeEnd = self.codeStarts[last] if last < count else len(bytecode) - 1
+        bytecode[codeStart:codeEnd] = code
+        codeDelta = len(code) - (codeEnd - codeStart)
+        starts, ends, codeStarts = self.starts, self.ends, self.codeStarts
+        for index in range(last, count):
+            starts[index] += delta
+            ends[index] += delta
+            codeStarts[index] += codeDelta
+        starts[first:last] = [span[0] for span in spans]
+        ends[first:last] = [span[1] for span in spans]
+        codeStarts[first:last] = [codeStart + span[2] for span in spans]
+        self.declares[first:last] = [statement[0] for statement in statements]
+        self.uses[first:last] = [statement[1] for statement in statements]
+
+    # every use of these globals must follow a statement declaring them, as
+    # the single pass Parser requires
+    def check_declarations(self, names):
+        declares = self.declares
+        for name in names:
+            try:
+                declared = declares.index(name)
+            except ValueError:
+                declared = len(declares)
+            for index in range(min(declared + 1, len(declares))):
+                if name in self.uses[index]:
+                    raise Exception("Undefined variable '" + name + "'")
+
+    # source span and bytecode range [start, end) of statement `index`
+    def statement(self, index):
+        codeEnd = self.codeStarts[index + 1] if index + 1 < len(self.codeStarts) else len(self.vm.bytecode) - 1
+        return (self.starts[index], self.ends[index]), (self.codeStarts[index], codeEnd)
+
+    # runs the chunk from the top, with the globals left by the previous run
+    def run(self):
+        if self.error is not None:
+            raise Exception("Source does not compile: " + self.error)
+        self.vm.ip = 0
+        self.vm.stack = []
+        return self.vm.run()
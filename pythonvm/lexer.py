@@ -0,0 +1,375 @@
+import mmap
+import sys
+from .tokens import Token, TokenType
+
+# Keywords are scanned as identifiers and then resolved with one lookup in
+# this table, so identifiers that merely start with a keyword ("beginning",
+# "double", "printer") stay identifiers.
+KEYWORDS = {
+    'var': TokenType.VAR,
+    'begin': TokenType.BEGIN,
+    'end': TokenType.END,
+    'then': TokenType.THEN,
+    'else': TokenType.ELSE,
+    'print': TokenType.PRINT,
+    'if': TokenType.IF,
+    'while': TokenType.WHILE,
+    'do': TokenType.DO,
+    'return': TokenType.RETURN,
+    'nil': TokenType.NIL,
+    'true': TokenType.TRUE,
+    'false': TokenType.FALSE,
+}
+
+
+class Lexer:
+    def __init__(self, source):
+        self.source = source
+        self.tokens = []
+        self.current = 0
+        self.start = 0
+        self.line = 1
+
+    def tokenize(self):
+        while not self.is_at_end():
+            self.start = self.current
+            self.scan_token()
+        self.tokens.append(Token(TokenType.EOF, "EOF", None, self.line, self.current))
+        return self.tokens
+
+    def is_at_end(self):
+        return self.current >= len(self.source)
+
+    def advance(self):
+        self.current += 1
+        return self.source[self.current - 1]
+
+    def text(self, start, end):
+        return self.source[start:end]
+
+    def add_token(self, type, literal=None):
+        text = self.text(self.start, self.current)
+        self.tokens.append(Token(type, text, literal, self.line, self.start))
+
+    def scan_token(self):
+        char = self.advance()
+        if char == ' ' or char == '\r' or char == '\t':
+            pass
+        elif char == '\n':
+            self.line += 1
+        elif char.isdigit() or char == '.':
+            self.number()
+        elif char == '"':
+            self.string()
+        elif char == '+':
+            self.add_token(TokenType.PLUS)
+        elif char == '-':
+            self.add_token(TokenType.MINUS)
+        elif char == '!':
+            if self.match('='):
+                self.add_token(TokenType.BANG_EQUAL)
+            else:
+                self.add_token(TokenType.BANG)
+        elif char == '<':
+            if self.match('='):
+                self.add_token(TokenType.LESS_EQUAL)
+            else:
+                self.add_token(TokenType.LESS)
+        elif char == '>':
+            if self.match('='):
+                self.add_token(TokenType.GREATER_EQUAL)
+            else:
+                self.add_token(TokenType.GREATER)
+        elif char == '*':
+            self.add_token(TokenType.STAR)
+        elif char == '/':
+            self.add_token(TokenType.SLASH)
+        elif char == '%':
+            self.add_token(TokenType.PERCENT)
+        elif char == '^':
+            self.add_token(TokenType.CARET)
+        elif char == '=':
+            if self.match('='):
+                self.add_token(TokenType.EQUAL_EQUAL)
+            else:
+                self.add_token(TokenType.EQUAL)
+        elif char == ';':
+            self.add_token(TokenType.SEMICOLON)
+        elif char == '(':
+            self.add_token(TokenType.LPAREN)
+        elif char == ')':
+            self.add_token(TokenType.RPAREN)
+        elif char == '[':
+            self.add_token(TokenType.LBRACKET)
+        elif char == ']':
+            self.add_token(TokenType.RBRACKET)
+        elif char == '{':
+            while self.peek() != '}' and not self.is_at_end():
+                if self.peek() == '\n':
+                    self.line += 1
+                self.advance()
+            if self.is_at_end():
+                raise Exception("Unterminated comment. at line: " + str(self.line))
+        elif char == '}':
+            self.advance()
+            
+        elif char == '#':
+            while self.peek() != '\n' and not self.is_at_end():
+                self.advance()            
+        elif char.isalpha() or char == '_':
+            self.identifier()
+        elif char == ',':
+            self.add_token(TokenType.COMMA)
+        else:
+            raise Exception(f"Unexpected character: {char} at line: {self.line}")
+
+    def match(self, expected):
+        if self.is_at_end():
+            return False
+        if self.source[self.current:self.current+len(expected)] != expected:
+            return False
+        self.current += len(expected)
+        return True
+
+    def number(self):
+        isFloat = False
+        while self.peek().isdigit() or (self.peek() == '.'):
+            if self.peek() == '.':
+                isFloat = True
+            self.advance()
+        if isFloat:
+            self.add_token(TokenType.FLOAT, float(self.text(self.start, self.current)))
+        else:
+            self.add_token(TokenType.INTEGER, int(self.text(self.start, self.current)))
+
+    def string(self):
+        while self.peek() != '"' and not self.is_at_end():
+            if self.peek() == '\n':
+                self.line += 1
+            self.advance()
+        if self.is_at_end():
+            raise Exception("Unterminated string " + " at line: " + str(self.line))
+        self.advance()  
+        value = sys.intern(self.text(self.start + 1, self.current - 1))
+        self.add_token(TokenType.STRING, value)
+
+    def identifier(self):
+        while self.peek().isalnum() or self.peek() == '_':
+            self.advance()
+        text = self.text(self.start, self.current)
+        type = KEYWORDS.get(text)
+        if type is not None:
+            self.tokens.append(Token(type, text, None, self.line, self.start))
+        else:
+            # interned, so name lookups in the parser and the VM hit on identity
+            text = sys.intern(text)
+            self.tokens.append(Token(TokenType.IDENTIFIER, text, text, self.line, self.start))
+
+    def peek(self):
+        if self.is_at_end():
+            return '\0'
+        return self.source[self.current]
+
+
+# byte -> character seen by scan_token for ascii bytes
+BYTE_CHARS = tuple(chr(b) for b in range(128))
+
+# classes of the bytes FileLexer.tokenize scans itself; BYTE_OTHER ('}',
+# unknown and non-ascii bytes) goes through Lexer.scan_token
+BYTE_OTHER = 0
+BYTE_BLANK = 1
+BYTE_NEWLINE = 2
+BYTE_NAME = 3
+BYTE_NUMBER = 4
+BYTE_QUOTE = 5
+BYTE_HASH = 6
+BYTE_BRACE = 7
+BYTE_SINGLE = 8
+BYTE_PAIRED = 9
+
+# operators of one character, and those that may be followed by '='
+SINGLE_BYTES = {ord(char): type for char, type in (
+    ('+', TokenType.PLUS), ('-', TokenType.MINUS), ('*', TokenType.STAR), ('/', TokenType.SLASH),
+    ('%', TokenType.PERCENT), ('^', TokenType.CARET), (';', TokenType.SEMICOLON),
+    ('(', TokenType.LPAREN), (')', TokenType.RPAREN), ('[', TokenType.LBRACKET),
+    (']', TokenType.RBRACKET), (',', TokenType.COMMA))}
+PAIRED_BYTES = {ord(char): types for char, types in (
+    ('!', (TokenType.BANG, TokenType.BANG_EQUAL)), ('<', (TokenType.LESS, TokenType.LESS_EQUAL)),
+    ('>', (TokenType.GREATER, TokenType.GREATER_EQUAL)), ('=', (TokenType.EQUAL, TokenType.EQUAL_EQUAL)))}
+
+
+def byte_class(byte):
+    char = chr(byte)
+    if byte >= 0x80:
+        return BYTE_OTHER
+    if char in " \r\t":
+        return BYTE_BLANK
+    if char == "\n":
+        return BYTE_NEWLINE
+    if char.isalpha() or char == "_":
+        return BYTE_NAME
+    if char.isdigit() or char == ".":
+        return BYTE_NUMBER
+    if byte in SINGLE_BYTES:
+        return BYTE_SINGLE
+    if byte in PAIRED_BYTES:
+        return BYTE_PAIRED
+    return {'"': BYTE_QUOTE, "#": BYTE_HASH, "{": BYTE_BRACE}.get(char, BYTE_OTHER)
+
+
+BYTE_CLASSES = tuple(byte_class(byte) for byte in range(256))
+# bytes continuing an identifier / a number
+NAME_BYTES = tuple(byte < 0x80 and (chr(byte).isalnum() or byte == ord("_")) for byte in range(256))
+NUMBER_BYTES = tuple(byte < 0x80 and (chr(byte).isdigit() or byte == ord(".")) for byte in range(256))
+
+
+# Lexes a script file straight from a read-only memory map. The source is
+# never decoded as a whole: tokenize walks the bytes in one loop, scanning
+# blanks, identifiers and numbers as runs of ascii bytes and skipping
+# comments and strings with mmap.find, and only the slice of a token is
+# decoded when the token is produced. Anything else goes through
+# Lexer.scan_token, a non-ascii character being decoded on its own from its
+# utf-8 lead byte (so identifiers like "café" lex as they do in Lexer).
+# Token offsets are byte offsets into the file, not character offsets.
+class FileLexer(Lexer):
+    def __init__(self, path):
+        super().__init__(b"")
+        self.path = path
+        self.map = None
+
+    def tokenize(self):
+        with open(self.path, "rb") as file:
+            if file.seek(0, 2) > 0:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.source = self.map
+        try:
+            self.scan()
+            self.tokens.append(Token(TokenType.EOF, "EOF", None, self.line, self.current))
+            return self.tokens
+        finally:
+            self.source = b""
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+
+    def scan(self):
+        source = self.source
+        size = len(source)
+        classes = BYTE_CLASSES
+        append = self.tokens.append
+        current = self.current
+        line = self.line
+        while current < size:
+            byte = source[current]
+            kind = classes[byte]
+            if kind == BYTE_BLANK:
+                current += 1
+            elif kind == BYTE_NEWLINE:
+                line += 1
+                current += 1
+            elif kind == BYTE_NAME or kind == BYTE_NUMBER:
+                end = current + 1
+                run = NAME_BYTES if kind == BYTE_NAME else NUMBER_BYTES
+                while end < size and run[source[end]]:
+                    end += 1
+                if end < size and source[end] >= 0x80:
+                    # may continue with a non-ascii letter or digit: Lexer
+                    # scans the token again after its first character
+                    self.start, self.current, self.line = current, current + 1, line
+                    if kind == BYTE_NAME:
+                        self.identifier()
+                    else:
+                        self.number()
+                    current = self.current
+                    continue
+                text = source[current:end].decode("ascii")
+                if kind == BYTE_NUMBER:
+                    # as in Lexer.number, only a '.' after the first character makes a float
+                    if "." in text[1:]:
+                        append(Token(TokenType.FLOAT, text, float(text), line, current))
+                    else:
+                        append(Token(TokenType.INTEGER, text, int(text), line, current))
+                else:
+                    type = KEYWORDS.get(text)
+                    if type is not None:
+                        append(Token(type, text, None, line, current))
+                    else:
+                        text = sys.intern(text)
+                        append(Token(TokenType.IDENTIFIER, text, text, line, current))
+                current = end
+            elif kind == BYTE_SINGLE:
+                append(Token(SINGLE_BYTES[byte], BYTE_CHARS[byte], None, line, current))
+                current += 1
+            elif kind == BYTE_PAIRED:
+                types = PAIRED_BYTES[byte]
+                if current + 1 < size and source[current + 1] == 0x3D:
+                    append(Token(types[1], BYTE_CHARS[byte] + "=", None, line, current))
+                    current += 2
+                else:
+                    append(Token(types[0], BYTE_CHARS[byte], None, line, current))
+                    current += 1
+            elif kind == BYTE_HASH:
+                end = source.find(b"\n", current)
+                current = size if end == -1 else end
+            elif kind == BYTE_QUOTE or kind == BYTE_BRACE:
+                end = source.find(b'"' if kind == BYTE_QUOTE else b"}", current + 1)
+                line += source[current:size if end == -1 else end].count(b"\n")
+                if end == -1:
+                    self.current, self.line = size, line
+                    if kind == BYTE_QUOTE:
+                        raise Exception("Unterminated string " + " at line: " + str(line))
+                    raise Exception("Unterminated comment. at line: " + str(line))
+                if kind == BYTE_QUOTE:
+                    value = sys.intern(source[current + 1:end].decode("utf-8"))
+                    append(Token(TokenType.STRING, source[current:end + 1].decode("utf-8"), value, line, current))
+                    current = end + 1
+                else:
+                    # the '}' itself is left to scan_token, as in Lexer
+                    current = end
+            else:
+                self.start, self.current, self.line = current, current, line
+                self.scan_token()
+                current = self.current
+                line = self.line
+        self.current = current
+        self.line = line
+
+
+    def text(self, start, end):
+        return self.source[start:end].decode("utf-8")
+
+    # character starting at byte `at` and its length in bytes; an invalid
+    # sequence reads as one U+FFFD so errors still name something printable
+    def code_point(self, at):
+        byte = self.source[at]
+        size = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+        try:
+            return self.source[at:at+size].decode("utf-8"), size
+        except UnicodeDecodeError:
+            return '\ufffd', 1
+
+    def advance(self):
+        byte = self.source[self.current]
+        if byte < 0x80:
+            self.current += 1
+            return BYTE_CHARS[byte]
+        char, size = self.code_point(self.current)
+        self.current += size
+        return char
+
+    def match(self, expected):
+        if self.is_at_end():
+            return False
+        expected = expected.encode("ascii")
+        if self.source[self.current:self.current+len(expected)] != expected:
+            return False
+        self.current += len(expected)
+        return True
+
+    def peek(self):
+        if self.is_at_end():
+            return '\0'
+        byte = self.source[self.current]
+        if byte < 0x80:
+            return BYTE_CHARS[byte]
+        return self.code_point(self.current)[0]
@@ -0,0 +1,122 @@
+# Opt-in memory accounting for the pipeline, based on tracemalloc.
+#
+# Every phase (lex, parse, compile, run) is measured on its own:
+#   peak_bytes      highest traced allocation above the level at phase start
+#   retained_bytes  what is still allocated when the phase ends
+#   objects         live Token / AST node instances (found through gc) after it
+# plus the sizes of the tables the chunk ends up with. Output is plain JSON.
+#
+#   python -m pythonvm.memprofile script.pvm [--parser] [--indent 2]
+
+import gc
+import json
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from time import perf_counter
+
+from .lexer import Lexer
+from .parser import Parser
+from .syntax import Ast, Expr
+from .compiler import Compiler
+from .tokens import Token
+
+
+class NullOutput:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def count_objects():
+    counts = {}
+    for value in gc.get_objects():
+        if isinstance(value, (Token, Expr)):
+            name = type(value).__name__
+            counts[name] = counts.get(name, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+class MemoryProfile:
+    def __init__(self):
+        self.phases = []
+
+    def measure(self, phase, function, *arguments):
+        gc.collect()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        result = function(*arguments)
+        seconds = perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        self.phases.append({
+            "phase": phase,
+            "seconds": seconds,
+            "peak_bytes": peak - before,
+            "retained_bytes": current - before,
+            "objects": count_objects(),
+        })
+        return result
+
+
+def run_quietly(vm):
+    with redirect_stdout(NullOutput()):
+        vm.run()
+
+
+# Profiles one source text through the AST + Compiler pipeline, or through the
+# single pass Parser when singlePass is set (parse and compile are one phase
+# there). Returns a dict ready for json.dumps.
+def profile(source, singlePass=False):
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    try:
+        profile = MemoryProfile()
+        tokens = profile.measure("lex", Lexer(source).tokenize)
+        if singlePass:
+            vm = profile.measure("parse", Parser(tokens).compile)
+        else:
+            statements = profile.measure("parse", Ast(tokens).parse)
+            vm = profile.measure("compile", Compiler().compile, statements)
+        profile.measure("run", run_quietly, vm)
+        constants = {}
+        for value in vm.constants:
+            name = type(value).__name__
+            constants[name] = constants.get(name, 0) + 1
+        return {
+            "pipeline": "parser" if singlePass else "compiler",
+            "source_bytes": len(source.encode("utf-8")),
+            "phases": profile.phases,
+            "tables": {
+                "bytecode_slots": len(vm.bytecode),
+                "bytecode_bytes": sys.getsizeof(vm.bytecode),
+                "constants": len(vm.constants),
+                "constants_by_type": constants,
+                "constants_bytes": sys.getsizeof(vm.constants) + sum(sys.getsizeof(value) for value in vm.constants),
+                "globals": len(vm.varsNames),
+                "stack": len(vm.stack),
+            },
+        }
+    finally:
+        if not started:
+            tracemalloc.stop()
+
+
+def main(argv):
+    import argparse
+    arguments = argparse.ArgumentParser(prog="python -m pythonvm.memprofile",
+                                        description="per phase memory report as JSON")
+    arguments.add_argument("script")
+    arguments.add_argument("--parser", action="store_true", help="profile the single pass Parser")
+    arguments.add_argument("--indent", type=int, default=None)
+    options = arguments.parse_args(argv)
+    with open(options.script, encoding="utf-8") as file:
+        source = file.read()
+    print(json.dumps(profile(source, options.parser), indent=options.indent))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
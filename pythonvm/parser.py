@@ -0,0 +1,400 @@
+from .vm import OpCode, OPERANDS, COMPARISONS
+from .vm import VirtualMachine
+
+from .tokens import TokenType, Token
+from .vector import parse_vector
+
+
+# program         -> statement* EOF ;
+# statement       -> varDecl | exprStmt | printStmt | block | ifStmt | whileStmt ;
+# varDecl         -> "var" IDENTIFIER "=" expression ";" ;
+# exprStmt        -> expression ";" ;
+# block           -> "begin" statement* "end" ;
+# ifStmt          -> "if" expression "then" statement ( "else" statement )? ;
+# whileStmt       -> "while" expression "do" statement ;
+# expression      -> comparison ( ( "==" | "!=" ) comparison )* ;
+# comparison      -> addition ( ( "<" | "<=" | ">" | ">=" ) addition )* ;
+# addition        -> term ( ( "+" | "-" ) term )* ;
+# term            -> factor ( ( "*" | "/" | "%" ) factor )* ;
+# factor          -> unary ( "^" factor )? ;
+# unary           -> ( "-" | "!" ) unary | primary ;
+# primary         -> FLOAT | INTEGER | STRING | IDENTIFIER | "(" expression ")" | vector ;
+# vector          -> "[" ( "-"? number ( "," "-"? number )* )? "]" ;
+
+
+COMPARISON_OPCODES = {
+    TokenType.EQUAL_EQUAL: OpCode.OP_EQUAL,
+    TokenType.BANG_EQUAL: OpCode.OP_NOT_EQUAL,
+    TokenType.LESS: OpCode.OP_LESS,
+    TokenType.LESS_EQUAL: OpCode.OP_LESS_EQUAL,
+    TokenType.GREATER: OpCode.OP_GREATER,
+    TokenType.GREATER_EQUAL: OpCode.OP_GREATER_EQUAL,
+}
+
+
+class Parser:
+    # vm: compile into an existing machine (a fork, say) instead of a new one
+    def __init__(self, tokens, vm=None):
+        self.tokens = tokens
+        self.current = 0
+        self.vm = VirtualMachine() if vm is None else vm
+
+
+    
+    def match(self, *types):
+        for type in types:
+            if self.check(type):
+                self.advance()
+                return True
+        return False
+
+    def check(self, type):
+        if self.is_at_end():
+            return False
+        return self.peek().type == type
+
+    def advance(self):
+        if not self.is_at_end():
+            self.current += 1
+        return self.previous()
+
+    def is_at_end(self):
+        return self.peek().type == TokenType.EOF
+
+    def peek(self):
+        return self.tokens[self.current]
+
+    def previous(self):
+        return self.tokens[self.current - 1]
+
+    def consume(self, type, message):
+        if self.check(type):
+            return self.advance()
+        raise Exception(message)
+   
+   
+    def endCompiler(self):
+        self.emitReturn()
+    def emitReturn(self):
+        self.vm.write_chunk(OpCode.OP_RETURN)
+    
+    def emitByte(self, bytecode):
+        self.vm.write_chunk(bytecode)
+    
+    def emitBytes(self, bytecode1, bytecode2):
+        self.vm.write_chunk(bytecode1)
+        self.vm.write_chunk(bytecode2)
+    
+    def emitConstant(self, value):
+        const_index = self.vm.add_constant(value)
+        self.emitBytes(OpCode.OP_CONSTANT, const_index)
+
+    # jumps are emitted with a placeholder offset, patched once the target is known
+    def emitJump(self, opcode, operand=None):
+        self.vm.write_chunk(opcode, operand)
+        self.vm.write_chunk(0)
+        return len(self.vm.bytecode) - 1
+
+    def patchJump(self, at):
+        self.vm.bytecode[at] = len(self.vm.bytecode) - at - 1
+
+    def emitLoop(self, start):
+        self.vm.write_chunk(OpCode.OP_LOOP, len(self.vm.bytecode) + 2 - start)
+
+    # jump taken when the condition compiled from conditionStart on is false;
+    # a comparison ending the condition is fused into OP_COMPARE_JUMP
+    def emitConditionJump(self, conditionStart):
+        bytecode = self.vm.bytecode
+        ip = conditionStart
+        last = -1
+        while ip < len(bytecode):
+            last = ip
+            ip += 1 + OPERANDS.get(bytecode[ip], 0)
+        if last == len(bytecode) - 1 and bytecode[last] in COMPARISONS:
+            return self.emitJump(OpCode.OP_COMPARE_JUMP, bytecode.pop())
+        return self.emitJump(OpCode.OP_JUMP_IF_FALSE)
+
+
+
+
+    def compile(self):
+        while not self.is_at_end():
+            self.declaration()
+        self.vm.write_chunk(OpCode.OP_RETURN)
+        return self.vm
+
+    def parse(self):
+        self.compile()
+        self.vm.run()
+        #self.vm.disassemble("test chunk")
+        self.vm.print_stack()
+        self.vm.print_variables()
+        self.vm.print_constants()
+        
+    
+    # declaration     -> varDecl | statement ;
+    def declaration(self):
+        if self.match(TokenType.VAR):
+            self.var_declaration()
+        else:
+            self.statement()
+
+       
+        
+
+    # statement       -> printStmt | exprStmt | block | ifStmt | whileStmt ;
+    def statement(self):
+        if self.match(TokenType.BEGIN):
+            self.block()
+        elif self.match(TokenType.PRINT):
+            self.printStatement()
+        elif self.match(TokenType.IF):
+            self.ifStatement()
+        elif self.match(TokenType.WHILE):
+            self.whileStatement()
+        else:
+            self.expression_statement()
+
+    def ifStatement(self):
+        conditionStart = len(self.vm.bytecode)
+        self.expression()
+        self.consume(TokenType.THEN, "Expect 'then' after condition.")
+        thenJump = self.emitConditionJump(conditionStart)
+        self.statement()
+        if self.match(TokenType.ELSE):
+            elseJump = self.emitJump(OpCode.OP_JUMP)
+            self.patchJump(thenJump)
+            self.statement()
+            self.patchJump(elseJump)
+        else:
+            self.patchJump(thenJump)
+
+    def whileStatement(self):
+        loopStart = len(self.vm.bytecode)
+        self.expression()
+        self.consume(TokenType.DO, "Expect 'do' after condition.")
+        exitJump = self.emitConditionJump(loopStart)
+        self.statement()
+        self.emitLoop(loopStart)
+        self.patchJump(exitJump)
+
+    def variable(self):
+        token = self.previous()
+        name = token.lexeme
+        if self.match(TokenType.EQUAL):
+            self.expression()
+            self.vm.updateGlobal(name)
+            #print ("VARIABLE set", name)
+
+        else :
+            token = self.previous()
+            self.vm.getGlobal(name)
+            #print("VARIABLE get", token)
+    
+    def printStatement(self):
+        self.consume(TokenType.LPAREN, "Expect '(' after 'print'.")
+        self.expression()
+        self.consume(TokenType.RPAREN, "Expect ')' after expression.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+        self.emitByte(OpCode.OP_PRINT)
+
+    def var_declaration(self):
+        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+        if self.match(TokenType.EQUAL):
+            self.expression()
+        else :
+            self.emitByte(OpCode.OP_NIL)
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
+        self.vm.addGlobal(name.lexeme, None)        # the virtual machine will add the value 
+
+
+
+
+    def identifierConstant(self,name):
+        for i in range(len(self.vm.constants)):
+            if self.vm.constants[i] == name:
+                return i
+        return -1
+
+    def block(self):
+        while not self.check(TokenType.END) and not self.is_at_end():
+            self.statement()
+        self.consume(TokenType.END, "Expect 'end' after block.")
+
+    def expression_statement(self):
+        self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+        self.emitByte(OpCode.OP_POP)
+
+    def expression(self):
+        self.comparison()
+        while self.match(TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            operator = self.previous()
+            self.comparison()
+            self.emitByte(COMPARISON_OPCODES[operator.type])
+
+    def comparison(self):
+        self.addition()
+        while self.match(TokenType.LESS, TokenType.LESS_EQUAL, TokenType.GREATER, TokenType.GREATER_EQUAL):
+            operator = self.previous()
+            self.addition()
+            self.emitByte(COMPARISON_OPCODES[operator.type])
+
+    def addition(self):
+        self.term()
+        while self.match(TokenType.PLUS, TokenType.MINUS):
+            operator = self.previous()
+            self.term()
+            if operator.type == TokenType.PLUS:
+                self.emitByte(OpCode.OP_ADD)
+            elif operator.type == TokenType.MINUS:
+                self.emitByte(OpCode.OP_SUBTRACT)
+
+    def term(self):
+        self.factor()
+        while self.match(TokenType.STAR, TokenType.SLASH, TokenType.PERCENT):
+            operator = self.previous()
+            self.factor()
+            if operator.type == TokenType.STAR:
+                self.emitByte(OpCode.OP_MULTIPLY)
+            elif operator.type == TokenType.SLASH:
+                self.emitByte(OpCode.OP_DIVIDE)
+            elif operator.type == TokenType.PERCENT:
+                self.emitByte(OpCode.OP_MODULO)
+
+    def factor(self):
+        self.unary()
+        while self.match(TokenType.CARET):
+            self.factor()
+            self.emitByte(OpCode.OP_POWER)
+
+    def unary(self):
+        if self.match(TokenType.MINUS):
+            self.unary()
+            self.emitByte(OpCode.OP_NEGATE)
+        elif self.match(TokenType.BANG):
+            self.unary()
+            self.emitByte(OpCode.OP_NOT)
+        else:
+            self.primary()
+
+    def primary(self):
+        if self.match(TokenType.INTEGER, TokenType.FLOAT):
+            self.emitConstant(self.previous().literal)
+        elif self.match(TokenType.STRING):
+            string_literal = self.previous().literal
+            self.emitConstant(string_literal)
+        elif self.match(TokenType.TRUE):
+            self.emitByte(OpCode.OP_TRUE)
+        elif self.match(TokenType.FALSE):
+            self.emitByte(OpCode.OP_FALSE)
+        elif self.match(TokenType.NIL):
+            self.emitByte(OpCode.OP_NIL)
+        elif self.match(TokenType.IDENTIFIER):
+            self.variable()
+        elif self.match(TokenType.LPAREN):
+            self.expression()
+            self.consume(TokenType.RPAREN, "Expect ')' after expression.")
+        elif self.match(TokenType.LBRACKET):
+            self.emitConstant(parse_vector(self))
+        else:
+            raise Exception("Expect expression, but have" + str(self.previous()))
+
+
+# operator token -> (precedence, right associative, opcode)
+BINARY_OPERATORS = {
+    TokenType.EQUAL_EQUAL: (1, False, OpCode.OP_EQUAL),
+    TokenType.BANG_EQUAL: (1, False, OpCode.OP_NOT_EQUAL),
+    TokenType.LESS: (2, False, OpCode.OP_LESS),
+    TokenType.LESS_EQUAL: (2, False, OpCode.OP_LESS_EQUAL),
+    TokenType.GREATER: (2, False, OpCode.OP_GREATER),
+    TokenType.GREATER_EQUAL: (2, False, OpCode.OP_GREATER_EQUAL),
+    TokenType.PLUS: (3, False, OpCode.OP_ADD),
+    TokenType.MINUS: (3, False, OpCode.OP_SUBTRACT),
+    TokenType.STAR: (4, False, OpCode.OP_MULTIPLY),
+    TokenType.SLASH: (4, False, OpCode.OP_DIVIDE),
+    TokenType.PERCENT: (4, False, OpCode.OP_MODULO),
+    TokenType.CARET: (5, True, OpCode.OP_POWER),
+}
+# prefix '-' and '!' bind tighter than every binary operator, '^' included
+NEGATE = (6, True, OpCode.OP_NEGATE)
+NOT = (6, True, OpCode.OP_NOT)
+LITERAL_TOKENS = (TokenType.INTEGER, TokenType.FLOAT, TokenType.STRING)
+KEYWORD_OPCODES = {
+    TokenType.TRUE: OpCode.OP_TRUE,
+    TokenType.FALSE: OpCode.OP_FALSE,
+    TokenType.NIL: OpCode.OP_NIL,
+}
+CLOSE_PAREN = object()
+
+
+# Same language and same bytecode as Parser, but expressions are parsed by a
+# table driven operator precedence loop with explicit stacks instead of one
+# Python call per grammar level. '(' and "name =" open a new operator frame
+# that is closed by ')' or by the end of the expression, so nesting depth is
+# only limited by memory and every token is handled once.
+class PrecedenceParser(Parser):
+    def expression(self):
+        tokens = self.tokens
+        emitByte = self.emitByte
+        ops = []
+        frames = []
+        closer = None
+        while True:
+            # operand position
+            token = tokens[self.current]
+            type = token.type
+            if type == TokenType.MINUS:
+                self.current += 1
+                ops.append(NEGATE)
+                continue
+            if type == TokenType.BANG:
+                self.current += 1
+                ops.append(NOT)
+                continue
+            if type in LITERAL_TOKENS:
+                self.current += 1
+                self.emitConstant(token.literal)
+            elif type in KEYWORD_OPCODES:
+                self.current += 1
+                emitByte(KEYWORD_OPCODES[type])
+            elif type == TokenType.IDENTIFIER:
+                self.current += 1
+                if tokens[self.current].type == TokenType.EQUAL:
+                    self.current += 1
+                    frames.append((ops, closer))
+                    ops = []
+                    closer = token.lexeme
+                    continue
+                self.vm.getGlobal(token.lexeme)
+            elif type == TokenType.LBRACKET:
+                self.current += 1
+                self.emitConstant(parse_vector(self))
+            elif type == TokenType.LPAREN:
+                self.current += 1
+                frames.append((ops, closer))
+                ops = []
+                closer = CLOSE_PAREN
+                continue
+            else:
+                raise Exception("Expect expression, but have" + str(self.previous()))
+
+            # operator position, closing finished frames until a binary operator follows
+            while True:
+                operator = BINARY_OPERATORS.get(tokens[self.current].type)
+                if operator is not None:
+                    precedence, right = operator[0], operator[1]
+                    while ops and (ops[-1][0] > precedence or (ops[-1][0] == precedence and not right)):
+                        emitByte(ops.pop()[2])
+                    ops.append(operator)
+                    self.current += 1
+                    break
+                while ops:
+                    emitByte(ops.pop()[2])
+                if closer is None:
+                    return
+                if closer is CLOSE_PAREN:
+                    self.consume(TokenType.RPAREN, "Expect ')' after expression.")
+                else:
+                    self.vm.updateGlobal(closer)
+                ops, closer = frames.pop()
@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from time import perf_counter
+
+
+# One VirtualMachine submitted to a Scheduler, with its latency statistics.
+#   wait        time spent ready but not running (queued behind other VMs)
+#   max_wait    longest single gap between two of its slices
+#   turnaround  submit to finish
+class VMTask:
+    def __init__(self, vm, name):
+        self.vm = vm
+        self.name = name
+        self.submitted = perf_counter()
+        self.queued = self.submitted
+        self.started = None
+        self.finished = None
+        self.slices = 0
+        self.running = 0.0
+        self.maxSlice = 0.0
+        self.waiting = 0.0
+        self.maxWait = 0.0
+        self.error = None
+        self.done = asyncio.Event()
+
+    async def wait(self):
+        await self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.vm
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "instructions": self.vm.executed,
+            "slices": self.slices,
+            "running": self.running,
+            "max_slice": self.maxSlice,
+            "wait": self.waiting,
+            "max_wait": self.maxWait,
+            "turnaround": None if self.finished is None else self.finished - self.submitted,
+            "error": None if self.error is None else str(self.error),
+        }
+
+
+# Multiplexes many VirtualMachines on one event loop. Each ready VM in turn
+# runs at most `quantum` instructions, then control goes back to the event
+# loop and the VM moves to the back of the queue (round robin), so a long
+# script delays the others by at most one quantum per turn.
+#
+# A finished task is dropped together with its VM; only its statistics are
+# kept, for the last `history` tasks, so a long-running service does not
+# grow with every script it has run.
+class Scheduler:
+    def __init__(self, quantum=1000, history=1000):
+        self.quantum = quantum
+        self.ready = deque()
+        self.tasks = {}             # unfinished tasks, in submission order
+        self.history = deque(maxlen=history)
+        self.submitted = 0
+        self.running = False
+        # the event loop only keeps a weak reference to tasks, so the one
+        # driving run() is held here until it finishes
+        self.runner = None
+
+    def submit(self, vm, name=None):
+        task = VMTask(vm, name if name is not None else "vm" + str(self.submitted))
+        self.submitted += 1
+        self.tasks[task] = None
+        self.ready.append(task)
+        return task
+
+    async def execute(self, vm, name=None):
+        task = self.submit(vm, name)
+        if not self.running and (self.runner is None or self.runner.done()):
+            self.runner = asyncio.get_running_loop().create_task(self.run())
+        return await task.wait()
+
+    # runs until no VM is ready; VMs submitted meanwhile join the rotation
+    async def run(self):
+        if self.running:
+            return self.stats()
+        self.running = True
+        try:
+            while self.ready:
+                task = self.ready.popleft()
+                begin = perf_counter()
+                wait = begin - task.queued
+                task.waiting += wait
+                if wait > task.maxWait:
+                    task.maxWait = wait
+                if task.started is None:
+                    task.started = begin
+                try:
+                    finished = task.vm.run(self.quantum)
+                except Exception as e:
+                    task.error = e
+                    finished = True
+                end = perf_counter()
+                task.slices += 1
+                task.running += end - begin
+                if end - begin > task.maxSlice:
+                    task.maxSlice = end - begin
+                if finished:
+                    task.finished = end
+                    task.done.set()
+                    del self.tasks[task]
+                    self.history.append(task.stats())
+                else:
+                    task.queued = end
+                    self.ready.append(task)
+                await asyncio.sleep(0)
+        finally:
+            self.running = False
+        return self.stats()
+
+    # finished tasks still in the history, then the unfinished ones
+    def stats(self):
+        return list(self.history) + [task.stats() for task in self.tasks]
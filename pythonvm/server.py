@@ -0,0 +1,316 @@
+# Local evaluation server: a long running process listening on a Unix domain
+# socket that runs scripts on a pool of pre-warmed worker processes, so
+# clients pay neither interpreter startup nor Lexer / Parser imports.
+#
+# Every connection carries newline delimited JSON requests, each answered by
+# one JSON line:
+#   {"source": "var x = 1; print(x);", "timeout": 2}
+#       -> {"ok": true, "output": "1\n", "cached": false, "seconds": ...}
+#   {"expression": "1 + 2"}
+#       -> {"ok": true, "value": "3", "output": "3\n", ...}
+#   {"metrics": true}
+#       -> requests, errors, throughput, latency percentiles, cache hits
+# Failures answer {"ok": false, "error": "..."}.
+#
+# Compiled chunks are shared through a cache directory keyed by the SHA-256
+# of the source; a worker compiles on a miss, writes the chunk atomically and
+# every worker maps it afterwards. The timeout of a request becomes the
+# deadline of its VM (set_limits); a worker that has not answered a little
+# after it (the deadline is only checked between blocks of instructions, and
+# compiling is not covered) is killed and replaced by a fresh warm one, so
+# runaway scripts cannot hold on to the pool.
+#
+#   python -m pythonvm.server /tmp/pythonvm.sock [--workers 4] [--cache DIR]
+
+import json
+import math
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+from collections import deque
+from time import monotonic, perf_counter
+
+# timeout of requests that do not give one, and the largest one accepted,
+# in seconds
+DEFAULT_TIMEOUT = 5.0
+MAX_TIMEOUT = 60.0
+
+# extra time the server waits for a worker past the request timeout
+TIMEOUT_GRACE = 1.0
+
+# integer '^' results, products and built strings are capped so a worker's
+# memory stays bounded until its deadline
+MAX_POWER_BITS = 1 << 20
+MAX_RESULT_BITS = 1 << 20
+
+# latencies kept for the percentiles
+LATENCY_WINDOW = 10000
+
+PERCENTILES = (50, 90, 99)
+
+
+# ---- worker side ----
+
+cacheDirectory = None
+
+
+def warm_worker(cache):
+    global cacheDirectory
+    cacheDirectory = cache
+    # import and exercise the whole pipeline once before the first request
+    evaluate("var warm = 1 + 2; print(warm);", DEFAULT_TIMEOUT, False)
+
+
+def chunk_path(source):
+    import hashlib
+    return os.path.join(cacheDirectory, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".pvmc")
+
+
+def compile_source(source, useCache):
+    from .vm import load_chunk
+    path = chunk_path(source) if useCache and cacheDirectory is not None else None
+    if path is not None:
+        try:
+            return load_chunk(path), True
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # written by another version, or damaged: compiled and replaced
+            pass
+    from .lexer import Lexer
+    from .parser import Parser
+    vm = Parser(Lexer(source).tokenize()).compile()
+    if path is not None:
+        # written under a private name and renamed, so other workers only
+        # ever see complete chunks
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            vm.save_chunk(temporary)
+            os.replace(temporary, path)
+        except (OSError, ValueError):
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    return vm, False
+
+
+def evaluate(source, timeout, useCache=True):
+    import io
+    from contextlib import redirect_stdout
+    start = perf_counter()
+    output = io.StringIO()
+    cached = False
+    try:
+        vm, cached = compile_source(source, useCache)
+        vm.set_limits(timeout=timeout, max_power_bits=MAX_POWER_BITS, max_result_bits=MAX_RESULT_BITS)
+        with redirect_stdout(output):
+            vm.run()
+        result = {"ok": True, "output": output.getvalue()}
+    except Exception as e:
+        result = {"ok": False, "error": str(e), "output": output.getvalue()}
+    result["cached"] = cached
+    result["seconds"] = perf_counter() - start
+    return result
+
+
+# main loop of a worker process: one (source, timeout) request in, one result
+# out, until the server closes the pipe
+def serve_worker(connection, cache):
+    warm_worker(cache)
+    while True:
+        try:
+            source, timeout = connection.recv()
+        except EOFError:
+            return
+        connection.send(evaluate(source, timeout))
+
+
+# ---- server side ----
+
+# One warm worker process and the pipe to it. A worker runs one request at a
+# time; the server kills it when it does not answer in time.
+class Worker:
+    def __init__(self, cache):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve_worker, args=(child, cache), daemon=True)
+        self.process.start()
+        child.close()
+
+    # the worker's result, or None when it did not answer within `wait`
+    def evaluate(self, source, timeout, wait):
+        self.connection.send((source, timeout))
+        if not self.connection.poll(wait):
+            return None
+        return self.connection.recv()
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cacheHits = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, result, latency):
+        with self.lock:
+            self.requests += 1
+            self.errors += not result["ok"]
+            self.timeouts += result.get("timeout", False)
+            self.cacheHits += result.get("cached", False)
+            self.latencies.append(latency)
+
+    def report(self):
+        with self.lock:
+            uptime = monotonic() - self.started
+            latencies = sorted(self.latencies)
+            report = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "uptime": uptime,
+                "throughput": self.requests / uptime if uptime > 0 else 0.0,
+                "cache_hits": self.cacheHits,
+                "cache_hit_rate": self.cacheHits / self.requests if self.requests else 0.0,
+            }
+        for percentile in PERCENTILES:
+            key = f"latency_p{percentile}"
+            if latencies:
+                report[key] = latencies[min(len(latencies) - 1, len(latencies) * percentile // 100)]
+            else:
+                report[key] = None
+        return report
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = self.server.answer(request)
+            except (ValueError, TypeError) as e:
+                response = {"ok": False, "error": "Invalid request: " + str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class EvaluationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, workers=None, cache=None):
+        if cache is None:
+            import tempfile
+            cache = tempfile.mkdtemp(prefix="pythonvm-chunks-")
+        os.makedirs(cache, exist_ok=True)
+        self.cache = cache
+        self.metrics = Metrics()
+        self.lock = threading.Lock()
+        self.workers = set()
+        self.idle = queue.Queue()
+        for _ in range(workers or os.cpu_count() or 1):
+            self.idle.put(self.start_worker())
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, RequestHandler)
+
+    def answer(self, request):
+        if request.get("metrics"):
+            return self.metrics.report()
+        expression = request.get("expression")
+        source = request.get("source") if expression is None else f"print({expression});"
+        if not isinstance(source, str):
+            raise ValueError("expected 'source', 'expression' or 'metrics'")
+        timeout = float(request.get("timeout", DEFAULT_TIMEOUT))
+        if not math.isfinite(timeout) or timeout <= 0:
+            raise ValueError("'timeout' must be a positive number of seconds")
+        timeout = min(timeout, MAX_TIMEOUT)
+        start = perf_counter()
+        worker = self.idle.get()
+        answered = False
+        try:
+            result = worker.evaluate(source, timeout, timeout + TIMEOUT_GRACE)
+            answered = result is not None
+            if not answered:
+                result = {"ok": False, "error": "Timed out", "timeout": True}
+        except Exception:
+            # the worker died (e.g. killed for running out of memory) or the
+            # exchange broke off
+            result = {"ok": False, "error": "Worker failed"}
+        finally:
+            # a worker that did not answer is still busy or has a reply
+            # pending in its pipe: it is killed rather than handed the next
+            # request
+            if not answered:
+                worker = self.replace_worker(worker)
+            self.idle.put(worker)
+        if expression is not None and result["ok"]:
+            result["value"] = result["output"].rstrip("\n")
+        self.metrics.record(result, perf_counter() - start)
+        return result
+
+    def start_worker(self):
+        worker = Worker(self.cache)
+        with self.lock:
+            self.workers.add(worker)
+        return worker
+
+    def replace_worker(self, worker):
+        worker.stop()
+        with self.lock:
+            self.workers.discard(worker)
+        return self.start_worker()
+
+    def server_close(self):
+        super().server_close()
+        with self.lock:
+            workers = list(self.workers)
+            self.workers.clear()
+        for worker in workers:
+            worker.stop()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+# Sends one request to a running server and returns the decoded answer.
+def request(path, payload):
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def main(argv):
+    import argparse
+    arguments = argparse.ArgumentParser(prog="python -m pythonvm.server",
+                                        description="evaluation server on a Unix domain socket")
+    arguments.add_argument("socket")
+    arguments.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    arguments.add_argument("--cache", default=None, help="compiled chunk cache directory")
+    options = arguments.parse_args(argv)
+    if not hasattr(socketserver, "UnixStreamServer"):
+        raise Exception("Unix domain sockets are not available on this platform")
+    with EvaluationServer(options.socket, options.workers, options.cache) as server:
+        print(f"Listening on {options.socket} (cache {server.cache})", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
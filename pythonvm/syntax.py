@@ -0,0 +1,659 @@
+from .tokens import TokenType, Token
+from .vector import parse_vector
+
+
+# program         -> statement* EOF ;
+# statement       -> varDecl | exprStmt | printStmt | block | ifStmt | whileStmt ;
+# varDecl         -> "var" IDENTIFIER "=" expression ";" ;
+# exprStmt        -> expression ";" ;
+# block           -> "begin" statement* "end" ;
+# ifStmt          -> "if" expression "then" statement ( "else" statement )? ;
+# whileStmt       -> "while" expression "do" statement ;
+# expression      -> comparison ( ( "==" | "!=" ) comparison )* ;
+# comparison      -> addition ( ( "<" | "<=" | ">" | ">=" ) addition )* ;
+# addition        -> term ( ( "+" | "-" ) term )* ;
+# term            -> factor ( ( "*" | "/" | "%" ) factor )* ;
+# factor          -> unary ( "^" factor )? ;
+# unary           -> ( "-" | "!" ) unary | primary ;
+# primary         -> FLOAT | INTEGER | STRING | IDENTIFIER ( "=" expression )? | "(" expression ")" | vector ;
+# vector          -> "[" ( "-"? number ( "," "-"? number )* )? "]" ;
+
+
+class Expr:
+    __slots__ = ()
+
+    def accept(self, visitor):
+        pass
+
+class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    
+
+    def __repr__(self):
+        return f'({self.left}, {self.operator}, {self.right})'
+    
+    def accept(self, visitor):
+        return visitor.visit_binary_expr(self)
+
+class Unary(Expr):
+    __slots__ = ('operator', 'right')
+
+    def __init__(self, operator, right):
+        self.operator = operator
+        self.right = right
+    
+
+    
+    def accept(self, visitor):
+        return visitor.visit_unary_expr(self)
+
+
+class Grouping(Expr):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+    
+    def accept(self, visitor):
+        return visitor.visit_grouping_expr(self)
+
+class Literal(Expr):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    
+    def __repr__(self):
+        return str(self.value)
+
+    def accept(self, visitor):
+        return visitor.visit_literal_expr(self)
+
+
+class VarDecl(Expr):
+    __slots__ = ('name', 'initializer')
+
+    def __init__(self, name, initializer):
+        self.name = name
+        self.initializer = initializer
+        
+    
+    
+    def accept(self, visitor):
+        return visitor.visit_var_decl_expr(self)
+
+class Print(Expr):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+    
+
+    
+    def accept(self, visitor):
+        return visitor.visit_print_expr(self)
+
+class Block(Expr):
+    __slots__ = ('declarations',)
+
+    def __init__(self, declarations):
+        self.declarations = declarations
+    
+
+    
+    def accept(self, visitor):
+        return visitor.visit_block_expr(self)
+
+
+class Variable(Expr):
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+    def accept(self, visitor):
+        return visitor.visit_variable_expr(self)
+
+
+class Assign(Expr):
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def accept(self, visitor):
+        return visitor.visit_assign_expr(self)
+
+
+class If(Expr):
+    __slots__ = ('condition', 'thenBranch', 'elseBranch')
+
+    def __init__(self, condition, thenBranch, elseBranch):
+        self.condition = condition
+        self.thenBranch = thenBranch
+        self.elseBranch = elseBranch
+
+    def accept(self, visitor):
+        return visitor.visit_if_expr(self)
+
+
+class While(Expr):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+    def accept(self, visitor):
+        return visitor.visit_while_expr(self)
+
+# Flat, index addressed storage for a parsed program. Nodes live in parallel
+# arrays in post-order (children before their parent), so a statement and all
+# of its sub-expressions occupy one contiguous index range and can be evaluated
+# by a single forward scan.
+#
+#   kinds      node kind (KIND_*)
+#   lefts      left child / initializer index, value index for leaves,
+#              first node of a block
+#   rights     right child index, name value index for declarations and
+#              assignments,
+#              statement count of a block
+#   operators  operator code (index into OPERATORS), 0 when unused
+#   values     literal values and (interned) variable names
+
+KIND_LITERAL = 0
+KIND_VARIABLE = 1
+KIND_UNARY = 2
+KIND_BINARY = 3
+KIND_PRINT = 4
+KIND_VAR_DECL = 5
+KIND_BLOCK = 6
+KIND_EXPR_STMT = 7
+KIND_ASSIGN = 8
+
+OPERATORS = (None, TokenType.PLUS, TokenType.MINUS, TokenType.STAR, TokenType.SLASH,
+             TokenType.PERCENT, TokenType.CARET, TokenType.GREATER, TokenType.GREATER_EQUAL,
+             TokenType.LESS, TokenType.LESS_EQUAL, TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL,
+             TokenType.BANG)
+OPERATOR_CODES = {type: code for code, type in enumerate(OPERATORS) if type is not None}
+# lambdas rather than the operator module, and array is imported by the
+# arena itself: both pull in collections, which short-lived processes that
+# only compile should not pay for
+BINARY_FUNCTIONS = (None, lambda a, b: a + b, lambda a, b: a - b, lambda a, b: a * b,
+                    lambda a, b: a / b, lambda a, b: a % b, lambda a, b: a ** b,
+                    lambda a, b: a > b, lambda a, b: a >= b, lambda a, b: a < b,
+                    lambda a, b: a <= b, lambda a, b: a == b, lambda a, b: a != b)
+UNARY_FUNCTIONS = {OPERATOR_CODES[TokenType.MINUS]: lambda a: -a,
+                   OPERATOR_CODES[TokenType.BANG]: lambda a: not a}
+
+ENTER = 0
+LEAVE = 1
+STATEMENT = 2
+LEAVE_STATEMENT = 3
+
+
+class AstArena:
+    def __init__(self):
+        from array import array
+        self.kinds = array('B')
+        self.lefts = array('i')
+        self.rights = array('i')
+        self.operators = array('B')
+        self.values = []
+        self.valueIndex = {}
+        self.roots = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @staticmethod
+    def build(statements):
+        arena = AstArena()
+        for statement in statements:
+            arena.add(statement)
+        return arena
+
+    def node(self, kind, left=-1, right=-1, operator=0):
+        self.kinds.append(kind)
+        self.lefts.append(left)
+        self.rights.append(right)
+        self.operators.append(operator)
+        return len(self.kinds) - 1
+
+    def value(self, value):
+        if isinstance(value, str):
+            index = self.valueIndex.get(value)
+            if index is None:
+                index = self.valueIndex[value] = len(self.values)
+                self.values.append(value)
+            return index
+        self.values.append(value)
+        return len(self.values) - 1
+
+    # flattens one statement without recursion, so arbitrarily deep trees fit
+    def add(self, statement):
+        tasks = [(statement, STATEMENT)]
+        results = []
+        while tasks:
+            node, state = tasks.pop()
+            if state == STATEMENT:
+                if isinstance(node, (If, While)):
+                    # the arena is scanned forward once, it has no jumps
+                    raise Exception("AstArena does not support if / while")
+                if isinstance(node, Block):
+                    results.append(len(self.kinds))
+                    tasks.append((node, LEAVE_STATEMENT))
+                    for declaration in reversed(node.declarations):
+                        tasks.append((declaration, STATEMENT))
+                elif isinstance(node, (Print, VarDecl)):
+                    tasks.append((node, LEAVE))
+                    child = node.expression if isinstance(node, Print) else node.initializer
+                    if child is not None:
+                        tasks.append((child, ENTER))
+                else:
+                    tasks.append((node, LEAVE_STATEMENT))
+                    tasks.append((node, ENTER))
+            elif state == LEAVE_STATEMENT:
+                if isinstance(node, Block):
+                    del results[len(results) - len(node.declarations):]
+                    first = results.pop()
+                    results.append(self.node(KIND_BLOCK, first, len(node.declarations)))
+                else:
+                    results.append(self.node(KIND_EXPR_STMT, results.pop()))
+            elif state == ENTER:
+                if isinstance(node, Literal):
+                    results.append(self.node(KIND_LITERAL, self.value(node.value)))
+                elif isinstance(node, Variable):
+                    results.append(self.node(KIND_VARIABLE, self.value(node.name.lexeme)))
+                elif isinstance(node, Grouping):
+                    tasks.append((node.expression, ENTER))
+                elif isinstance(node, Assign):
+                    tasks.append((node, LEAVE))
+                    tasks.append((node.value, ENTER))
+                elif isinstance(node, (Unary, Binary)):
+                    tasks.append((node, LEAVE))
+                    tasks.append((node.right, ENTER))
+                    if isinstance(node, Binary):
+                        tasks.append((node.left, ENTER))
+                else:
+                    raise Exception("Unknown expression: " + str(node))
+            else:
+                if isinstance(node, Binary):
+                    right = results.pop()
+                    left = results.pop()
+                    results.append(self.node(KIND_BINARY, left, right, OPERATOR_CODES[node.operator.type]))
+                elif isinstance(node, Unary):
+                    results.append(self.node(KIND_UNARY, results.pop(), -1, OPERATOR_CODES[node.operator.type]))
+                elif isinstance(node, Print):
+                    results.append(self.node(KIND_PRINT, results.pop()))
+                elif isinstance(node, Assign):
+                    results.append(self.node(KIND_ASSIGN, results.pop(), self.value(node.name.lexeme)))
+                else:
+                    initializer = results.pop() if node.initializer is not None else -1
+                    results.append(self.node(KIND_VAR_DECL, initializer, self.value(node.name.lexeme)))
+        self.roots.append(results.pop())
+
+
+# Name 	       Operators 	    Associates
+# Equality   	== !=       	Left
+# Comparison 	> >= < <=   	Left
+# Term 	        - + 	        Left
+# Factor 	    / * 	        Left
+# Unary 	    ! - 	        Right
+
+class Ast:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.current = 0
+
+
+
+
+    def match(self, *types):
+        for token_type in types:
+            if self.check(token_type):
+                self.advance()
+                return True
+        return False
+
+    def check(self, token_type):
+        if self.is_at_end():
+            return False
+        return self.peek().type == token_type
+
+    def advance(self):
+        if not self.is_at_end():
+            self.current += 1
+        return self.previous()
+
+    def is_at_end(self):
+        return self.peek().type == TokenType.EOF
+
+    def peek(self):
+        return self.tokens[self.current]
+
+    def previous(self):
+        return self.tokens[self.current - 1]
+
+    def consume(self, token_type, message):
+        if self.check(token_type):
+            return self.advance()
+        raise Exception(message)
+
+    def parse(self):
+        try:
+            statements = []
+            while not self.is_at_end():
+                statements.append(self.declaration())
+            return statements
+        except Exception as e:
+            print("Error parsing input: " + str(e))
+            return None
+
+    def declaration(self):
+        if self.match(TokenType.VAR):
+            return self.var_declaration()
+        else:
+            return self.statement()
+
+    def statement(self):
+        if self.match(TokenType.BEGIN):
+            return self.block()
+        elif self.match(TokenType.PRINT):
+            return self.print_statement()
+        elif self.match(TokenType.IF):
+            return self.if_statement()
+        elif self.match(TokenType.WHILE):
+            return self.while_statement()
+        else:
+            return self.expression_statement()
+
+    def if_statement(self):
+        condition = self.expression()
+        self.consume(TokenType.THEN, "Expect 'then' after condition.")
+        thenBranch = self.statement()
+        elseBranch = None
+        if self.match(TokenType.ELSE):
+            elseBranch = self.statement()
+        return If(condition, thenBranch, elseBranch)
+
+    def while_statement(self):
+        condition = self.expression()
+        self.consume(TokenType.DO, "Expect 'do' after condition.")
+        return While(condition, self.statement())
+
+
+    
+    def block(self):
+        declarations = []
+        while not self.check(TokenType.END) and not self.is_at_end():
+            declarations.append(self.declaration())
+        self.consume(TokenType.END, "Expect 'end' after block.")
+        return Block(declarations)
+
+    def expression_statement(self):
+        expr = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+        return expr
+
+    def expression(self):
+        expr = self.comparison()
+        while self.match(TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            operator = self.previous()
+            right = self.comparison()
+            expr = Binary(expr, operator, right)
+        return expr
+
+    def addition(self):
+        expr = self.term()
+        while self.match(TokenType.PLUS, TokenType.MINUS):
+            operator = self.previous()
+            right = self.term()
+            expr = Binary(expr, operator, right)
+        return expr
+    
+    def term(self):
+        expr = self.factor()
+        while self.match(TokenType.STAR, TokenType.SLASH, TokenType.PERCENT):
+            operator = self.previous()
+            right = self.factor()
+            expr = Binary(expr, operator, right)
+        return expr
+
+    def factor(self):
+        expr = self.unary()
+        while self.match(TokenType.CARET):
+            operator = self.previous()
+            right = self.factor()
+            expr = Binary(expr, operator, right)
+        return expr
+
+    def unary(self):
+        if self.match(TokenType.MINUS, TokenType.BANG):
+            operator = self.previous()
+            right = self.unary()
+            return Unary(operator, right)
+        return self.primary()
+
+    def comparison(self):
+        expr = self.addition()
+        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
+            operator = self.previous()
+            right = self.addition()
+            expr = Binary(expr, operator, right)
+        return expr
+
+    def print_statement(self):
+        self.consume(TokenType.LPAREN, "Expect '(' after 'print'.")
+        value = self.expression()
+        self.consume(TokenType.RPAREN, "Expect ')' after expression.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        return Print(value)
+    
+    def var_declaration(self):
+        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+        initializer = None
+        if self.match(TokenType.EQUAL):
+            initializer = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
+        return VarDecl(name, initializer)
+    
+    def primary(self):
+        if self.match(TokenType.INTEGER):
+            return Literal(self.previous().literal)
+        elif self.match(TokenType.FLOAT): 
+            return Literal(self.previous().literal)
+        elif self.match(TokenType.STRING):
+            return Literal(self.previous().literal)
+        elif self.match(TokenType.FALSE):
+            return Literal(0)
+        elif self.match(TokenType.TRUE):
+            return Literal(1)
+        elif self.match(TokenType.NIL):
+            return Literal(0)
+        elif self.match(TokenType.IDENTIFIER):
+            name = self.previous()
+            if self.match(TokenType.EQUAL):
+                return Assign(name, self.expression())
+            return Variable(name)
+        elif self.match(TokenType.LPAREN):
+            expr = self.expression()
+            self.consume(TokenType.RPAREN, "Expect ')' after expression.")
+            return Grouping(expr)
+        elif self.match(TokenType.LBRACKET):
+            return Literal(parse_vector(self))
+
+        raise Exception("Primary Expect expression.",self.peek())
+
+class Interpreter:
+    def __init__(self):
+        self.variables = {}
+        self.varsNames =[]
+
+    
+    def print_variables(self):
+        print("Variables:", self.variables)
+
+    def addGlobal(self, name, value):
+        self.variables[name] = value
+        self.varsNames.append(name)
+        return len(self.varsNames) - 1
+
+    def getGlobal(self, name):
+        return self.variables[name]
+
+    def setGlobal(self, name, value):
+        if name not in self.variables:
+            raise Exception("Undefined variable '" + name + "'")
+        self.variables[name] = value
+    
+    def variablesIndex(self, name):
+        for i in range(len(self.varsNames)):
+            if self.varsNames[i] == name:
+                return i
+        return -1
+
+    def interpret(self, statements):
+        try:
+            for statement in statements:
+                self.execute(statement)
+        except Exception as e:
+            print("Error interpreting input: " + str(e))
+            return None
+    
+    # walks an AstArena by index: one forward pass over the post-ordered nodes
+    # with a value stack, no recursion and no node objects
+    def interpret_arena(self, arena):
+        kinds = arena.kinds
+        lefts = arena.lefts
+        rights = arena.rights
+        operators = arena.operators
+        values = arena.values
+        stack = []
+        try:
+            for index in range(len(kinds)):
+                kind = kinds[index]
+                if kind == KIND_LITERAL:
+                    stack.append(values[lefts[index]])
+                elif kind == KIND_VARIABLE:
+                    stack.append(self.getGlobal(values[lefts[index]]))
+                elif kind == KIND_BINARY:
+                    right = stack.pop()
+                    stack.append(BINARY_FUNCTIONS[operators[index]](stack.pop(), right))
+                elif kind == KIND_UNARY:
+                    stack.append(UNARY_FUNCTIONS[operators[index]](stack.pop()))
+                elif kind == KIND_PRINT:
+                    print("PRINT: ", stack.pop())
+                elif kind == KIND_VAR_DECL:
+                    value = stack.pop() if lefts[index] != -1 else None
+                    self.addGlobal(values[rights[index]], value)
+                elif kind == KIND_EXPR_STMT:
+                    stack.pop()
+                elif kind == KIND_ASSIGN:
+                    self.setGlobal(values[rights[index]], stack[-1])
+        except Exception as e:
+            print("Error interpreting input: " + str(e))
+            return None
+
+    def execute(self, statement):
+        print("Accept :",statement)
+        statement.accept(self)
+
+    def evaluate(self, exp):
+        return exp.accept(self)
+
+    def visit(self, exp):
+        if exp is None:
+            return None
+        return self.evaluate(exp)
+    
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        
+        if expr.operator.type == TokenType.PLUS:
+            return left + right
+        elif expr.operator.type == TokenType.MINUS:
+            return left - right
+        elif expr.operator.type == TokenType.STAR:
+            return left * right
+        elif expr.operator.type == TokenType.SLASH:
+            return left / right
+        elif expr.operator.type == TokenType.GREATER:
+            return left > right
+        elif expr.operator.type == TokenType.GREATER_EQUAL:
+            return left >= right
+        elif expr.operator.type == TokenType.LESS:
+            return left < right
+        elif expr.operator.type == TokenType.LESS_EQUAL:
+            return left <= right
+        elif expr.operator.type == TokenType.EQUAL_EQUAL:
+            return left == right
+        elif expr.operator.type == TokenType.BANG_EQUAL:
+            return left != right
+        elif expr.operator.type == TokenType.PERCENT:
+            return left % right
+        elif expr.operator.type == TokenType.CARET:
+            return left ** right
+        else :
+            raise Exception("Unknown binary operator: " + str(expr.operator.type))
+        
+
+    def visit_literal_expr(self, expr):
+        return expr.value   
+    
+    def visit_unary_expr(self, expr):
+        right = self.evaluate(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            return -right
+        elif expr.operator.type == TokenType.BANG:
+            return not right
+    
+    def visit_grouping_expr(self, expr):
+        return self.evaluate(expr.expression)
+    
+    def visitExpressionStmt(self, stmt):
+        self.evaluate(stmt.expression)
+        
+    
+    def visit_var_decl_expr(self, expr):
+        value = self.visit(expr.initializer)
+        name  = expr.name.lexeme
+        self.addGlobal(name, value)
+
+    def visit_assign_expr(self, expr):
+        value = self.evaluate(expr.value)
+        self.setGlobal(expr.name.lexeme, value)
+        return value
+
+    def visit_variable_expr(self, expr):
+        return self.getGlobal(expr.name.lexeme)
+
+    def visit_block_expr(self, expr):
+        for declaration in expr.declarations:
+            self.execute(declaration)
+
+    def visit_if_expr(self, expr):
+        if self.evaluate(expr.condition):
+            self.execute(expr.thenBranch)
+        elif expr.elseBranch is not None:
+            self.execute(expr.elseBranch)
+
+    def visit_while_expr(self, expr):
+        while self.evaluate(expr.condition):
+            self.execute(expr.body)
+
+    def visit_print_expr(self, expr):
+        val = self.visit(expr.expression)
+        print("PRINT: ",val)
+        return val
+        
+    
\ No newline at end of file
@@ -0,0 +1,62 @@
+class TokenType:
+    FLOAT = 1
+    INTEGER = 2
+    STRING = 3
+    IDENTIFIER = 4
+    VAR = 5
+    EQUAL = 6
+    EQUAL_EQUAL = 7
+    BANG_EQUAL = 8
+    BANG = 9
+    LESS = 10
+    LESS_EQUAL = 11
+    GREATER = 12
+    GREATER_EQUAL = 13
+    PLUS = 14
+    MINUS = 15
+    STAR = 16
+    SLASH = 17
+    PERCENT = 18
+    CARET = 19
+    SEMICOLON = 20
+    BEGIN = 21
+    END = 22
+    NIL = 23
+    TRUE = 24
+    FALSE = 25
+    THEN = 26
+    ELSE = 27
+    PRINT = 28
+    IF = 29
+    WHILE = 30
+    DO = 31
+    RETURN = 32
+    COMMA = 33
+    LPAREN = 34
+    RPAREN = 35
+    LBRACKET = 36
+    RBRACKET = 37
+    EOF = 38
+
+TOKEN_NAMES = {value: name for name, value in vars(TokenType).items() if name.isupper()}
+
+
+def tokentostring(token):
+    return TOKEN_NAMES.get(token.type)
+
+class Token:
+    # offset: position of the first character in the lexed source, if known
+    def __init__(self, type, lexeme, literal, line, offset=None):
+        self.type = type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+        self.offset = offset
+
+    def __repr__(self):
+        return f"TokenType.{TOKEN_NAMES[self.type]} {self.lexeme} {self.literal}"
+    
+    def __str__(self):
+        if self.literal is None:
+            return "(" + self.lexeme + ")" + " " + tokentostring(self)
+        return "(" + self.lexeme + ")" + " " + tokentostring(self) + " " + str(self.literal)
@@ -0,0 +1,72 @@
+from .tokens import TokenType
+
+# Vector values: one-dimensional float64 NumPy arrays. The VM operators
+# already broadcast over them (a + v, v * v, -v, v ^ 2, ...), so a single
+# dispatched instruction does the work for every element. NumPy is an
+# optional dependency and is only imported once a vector is created or
+# loaded.
+#
+# Elements are always float64: integer arrays would wrap around on overflow
+# and refuse negative integer powers, unlike the VM's scalar ints.
+
+# vectors longer than this print as a summary instead of their elements
+PRINT_ELEMENTS = 8
+
+
+def numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception("Vector values need numpy, which is not installed")
+    return numpy
+
+
+def is_vector(value):
+    return type(value).__name__ == "ndarray"
+
+
+def make_vector(values):
+    return numpy().array(values, dtype="float64")
+
+
+# vector -> "[" ( "-"? number ( "," "-"? number )* )? "]"
+# called by Parser and Ast after they matched '['
+def parse_vector(parser):
+    values = []
+    if not parser.check(TokenType.RBRACKET):
+        while True:
+            negative = parser.match(TokenType.MINUS)
+            if not parser.match(TokenType.INTEGER, TokenType.FLOAT):
+                raise Exception("Expect number in vector literal, but have" + str(parser.peek()))
+            value = parser.previous().literal
+            values.append(-value if negative else value)
+            if not parser.match(TokenType.COMMA):
+                break
+    parser.consume(TokenType.RBRACKET, "Expect ']' after vector elements.")
+    return make_vector(values)
+
+
+def summary(value):
+    if value.size <= PRINT_ELEMENTS:
+        return "vector[" + str(value.size) + "] " + str(value.tolist())
+    return (f"vector[{value.size}] min={value.min():g} max={value.max():g} "
+            f"mean={value.mean():g} first={value[0]:g} last={value[-1]:g}")
+
+
+# marshal cannot store arrays: they travel as (dtype, shape, raw bytes) tuples,
+# a type no other constant or value of the language uses
+def pack(value):
+    return (value.dtype.str, value.shape, value.tobytes())
+
+
+def unpack(packed):
+    dtype, shape, data = packed
+    return numpy().frombuffer(data, dtype=dtype).reshape(shape).copy()
+
+
+def pack_values(values):
+    return [pack(value) if is_vector(value) else value for value in values]
+
+
+def unpack_values(values):
+    return [unpack(value) if type(value) is tuple else value for value in values]
@@ -0,0 +1,751 @@
+import marshal
+import mmap
+import struct
+import sys
+from time import monotonic
+
+# Opcodes are plain ints: bytecode read back from a chunk file compares equal
+# without conversion, and importing the VM does not pull in the enum module.
+class OpCode:
+    OP_NIL = 1
+    OP_TRUE = 2
+    OP_FALSE = 3
+    OP_CONSTANT = 4
+    OP_ADD = 5
+    OP_SUBTRACT = 6
+    OP_MULTIPLY = 7
+    OP_DIVIDE = 8
+    OP_MODULO = 9
+    OP_POWER = 10
+    OP_PRINT = 11
+    OP_NEGATE = 12
+    OP_RETURN = 13
+    OP_SET_GLOBAL = 14
+    OP_GET_GLOBAL = 15
+    OP_POP = 16
+    OP_MEMO = 17
+    OP_MEMO_STORE = 18
+    OP_EQUAL = 19
+    OP_NOT_EQUAL = 20
+    OP_LESS = 21
+    OP_LESS_EQUAL = 22
+    OP_GREATER = 23
+    OP_GREATER_EQUAL = 24
+    OP_NOT = 25
+    OP_JUMP = 26
+    OP_JUMP_IF_FALSE = 27
+    OP_LOOP = 28
+    OP_COMPARE_JUMP = 29
+
+OPCODE_NAMES = {value: name for name, value in vars(OpCode).items() if name.startswith("OP_")}
+
+
+# instructions run between two checks of quantum, fuel and deadline
+CHECK_INTERVAL = 1024
+
+
+# Raised when a run goes over one of the limits given to set_limits; carries
+# the ip of the offending instruction and the fuel used so far.
+class VMLimitError(Exception):
+    def __init__(self, message, ip, fuel):
+        super().__init__(f"{message} at ip {ip} after {fuel} instructions")
+        self.ip = ip
+        self.fuel = fuel
+
+class FuelExhausted(VMLimitError):
+    pass
+
+class DeadlineExceeded(VMLimitError):
+    pass
+
+class OperandTooLarge(VMLimitError):
+    pass
+
+
+# number of operand slots following each opcode in the bytecode
+OPERANDS = {
+    OpCode.OP_CONSTANT: 1,
+    OpCode.OP_SET_GLOBAL: 1,
+    OpCode.OP_GET_GLOBAL: 1,
+    OpCode.OP_MEMO: 2,
+    OpCode.OP_MEMO_STORE: 1,
+    OpCode.OP_JUMP: 1,
+    OpCode.OP_JUMP_IF_FALSE: 1,
+    OpCode.OP_LOOP: 1,
+    OpCode.OP_COMPARE_JUMP: 2,
+}
+
+# Jump offsets are unsigned and relative to the instruction after the jump:
+# OP_JUMP / OP_JUMP_IF_FALSE move forward, OP_LOOP backward, so code can be
+# moved or spliced without patching. OP_COMPARE_JUMP is a comparison fused
+# with OP_JUMP_IF_FALSE: its first operand is the comparison opcode. Loops
+# need no extra checks: fuel and deadline are counted per instruction.
+COMPARISONS = {
+    OpCode.OP_EQUAL: lambda a, b: a == b,
+    OpCode.OP_NOT_EQUAL: lambda a, b: a != b,
+    OpCode.OP_LESS: lambda a, b: a < b,
+    OpCode.OP_LESS_EQUAL: lambda a, b: a <= b,
+    OpCode.OP_GREATER: lambda a, b: a > b,
+    OpCode.OP_GREATER_EQUAL: lambda a, b: a >= b,
+}
+
+# cached results kept per memo slot before the least recently used is dropped
+MEMO_CAPACITY = 64
+
+# value types whose equality is cheap and exact enough to tell that an
+# OP_SET_GLOBAL stored the same value again
+MEMO_SCALARS = (int, float, str)
+
+
+# lower bound of the size in bits of a '*' or '+' result, strings counting
+# 8 bits per character; 0 for operands whose result size is not a concern
+def result_bits(a, b, multiply):
+    if multiply:
+        if type(a) is int and type(b) is int:
+            return 0 if a == 0 or b == 0 else a.bit_length() + b.bit_length() - 1
+        if type(a) is str and type(b) is int:
+            return len(a) * b * 8
+        if type(a) is int and type(b) is str:
+            return a * len(b) * 8
+    elif type(a) is str and type(b) is str:
+        return (len(a) + len(b)) * 8
+    return 0
+
+
+# chunk file layout:
+#   header   magic, version, byte order, meta size, code offset, code count
+#   meta     marshal((constants, varsNames, memoReads)), deserialized eagerly
+#   code     bytecode as native unsigned 32 bit ints, 8 byte aligned, mapped
+CHUNK_MAGIC = b"PVMC"
+CHUNK_VERSION = 2
+CHUNK_HEADER = struct.Struct("<4sHBxIII")
+CHUNK_ORDER = 0 if sys.byteorder == "little" else 1
+
+# snapshot file: magic followed by one marshal record
+#   (version, byte order, varsNames, variables, constants, bytecode, stack, ip,
+#    memoReads)
+SNAPSHOT_MAGIC = b"PVMS"
+SNAPSHOT_VERSION = 2
+
+
+# Globals of a forked VM: writes land in this dict, names it does not hold
+# are read from the frozen base layer the fork was made from. Iterating or
+# len() only covers the overlay; flatten() gives the merged view.
+class GlobalOverlay(dict):
+    __slots__ = ("base",)
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def __missing__(self, name):
+        return self.base[name]
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or name in self.base
+
+    def get(self, name, default=None):
+        if dict.__contains__(self, name):
+            return dict.__getitem__(self, name)
+        return self.base.get(name, default)
+
+    def flatten(self):
+        variables = dict(self.base)
+        variables.update(self)
+        return variables
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+
+# tables a fork shares with its parent until it first writes to them; a
+# loaded chunk starts with its mapped, read-only bytecode in the same state
+SHARED_TABLES = frozenset(("bytecode", "constants", "globals", "memo"))
+
+
+def flatten(variables):
+    if isinstance(variables, GlobalOverlay):
+        return variables.flatten()
+    return dict(variables)
+
+
+class VirtualMachine:
+    def __init__(self):
+        self.stack = []
+        self.ip = 0
+        self.bytecode = []
+        self.constants = []
+        self.variables = {}
+        self.varsNames =[]
+        self.globalsIndex = {}      # name -> slot in varsNames
+        self.chunk = None           # mapping backing the bytecode of a loaded chunk
+        self.executed = 0           # instructions executed by run so far
+        self.fuel = None
+        self.fuelStart = 0
+        self.deadline = None
+        self.maxPowerBits = None
+        self.maxResultBits = None
+        # memoized statements: names each slot reads, its cache keyed by the
+        # values of those names, and the slots reading each name
+        self.memoReads = []
+        self.memo = []
+        self.memoDependents = {}
+        self.memoPending = {}
+        self.memoCapacity = MEMO_CAPACITY
+        self.memoStats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0,
+                          "invalidations": 0, "uncacheable": 0}
+        self.frozen = None          # read-only globals forks are layered on
+        self.shared = frozenset()   # SHARED_TABLES not yet copied by this VM
+
+    # Freezes the current globals into the base layer of the next forks; later
+    # changes here (or another freeze) do not reach forks made before. Running
+    # or changing a global drops the layer, and the next fork freezes again.
+    def freeze(self):
+        from types import MappingProxyType
+        self.frozen = MappingProxyType(flatten(self.variables))
+        return self.frozen
+
+    # O(1) copy-on-write fork: the new VM reads the frozen globals through an
+    # empty overlay and shares bytecode, constants, global slots and memo
+    # tables with this one; both sides are marked, so whichever writes to a
+    # table first copies it. It continues at this VM's ip, so code compiled
+    # into the fork runs after what already ran, over the globals as they are
+    # at that ip.
+    # Running the fork and setGlobal only grow its overlay. Compiling into it
+    # copies each table the first time it is written: appending code costs
+    # one copy of the bytecode, a new global one of the global slots.
+    # Memo caches stay shared: their entries are keyed by values and so hold
+    # in every fork.
+    def fork(self):
+        if self.frozen is None:
+            self.freeze()
+        vm = VirtualMachine()
+        vm.variables = GlobalOverlay(self.frozen)
+        vm.bytecode = self.bytecode
+        vm.constants = self.constants
+        vm.varsNames = self.varsNames
+        vm.globalsIndex = self.globalsIndex
+        vm.chunk = self.chunk
+        vm.ip = self.ip
+        vm.memoReads = self.memoReads
+        vm.memo = self.memo
+        vm.memoDependents = self.memoDependents
+        vm.memoCapacity = self.memoCapacity
+        vm.shared = SHARED_TABLES
+        self.shared = SHARED_TABLES
+        return vm
+
+    # gives this VM its own copy of one shared table before its first change
+    def unshare(self, table):
+        if table not in self.shared:
+            return
+        self.shared = self.shared - {table}
+        if table == "bytecode":
+            self.bytecode = list(self.bytecode)
+        elif table == "constants":
+            self.constants = list(self.constants)
+        elif table == "globals":
+            self.varsNames = list(self.varsNames)
+            self.globalsIndex = dict(self.globalsIndex)
+        elif table == "memo":
+            self.memoReads = list(self.memoReads)
+            self.memo = list(self.memo)
+            self.memoDependents = {name: list(slots) for name, slots in self.memoDependents.items()}
+
+    def add_constant(self, value):
+        if self.shared:
+            self.unshare("constants")
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def write_chunk(self, opcode, operand=None):
+        if self.shared:
+            self.unshare("bytecode")
+        self.bytecode.append(opcode)
+        if operand is not None:
+            self.bytecode.append(operand)
+
+    def disassemble(self,name):
+        print("========== Disassemble: " + name + " ===========")
+        ip = 0
+        while ip < len(self.bytecode):
+            opcode = self.bytecode[ip]
+            if opcode == OpCode.OP_CONSTANT:
+                operand = self.bytecode[ip + 1]
+                const_value = self.constants[operand]
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {operand} '{const_value}'")
+                ip += 2
+            elif opcode == OpCode.OP_SET_GLOBAL:
+                operand = self.bytecode[ip +1]
+                name  = self.varsNames[operand]
+                value = self.variables[name]
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {operand} '{name}' '{value}'")
+                ip += 2
+            elif opcode == OpCode.OP_GET_GLOBAL:
+                operand = self.bytecode[ip +1]
+                name  = self.varsNames[operand]
+                value = self.variables[name]
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {operand} '{name}' '{value}'")
+                ip += 2
+            elif opcode == OpCode.OP_MEMO:
+                slot = self.bytecode[ip + 1]
+                skip = self.bytecode[ip + 2]
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {slot} -> {ip + 3 + skip:04d} {self.memoReads[slot]}")
+                ip += 3
+            elif opcode == OpCode.OP_MEMO_STORE:
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {self.bytecode[ip + 1]}")
+                ip += 2
+            elif opcode == OpCode.OP_JUMP or opcode == OpCode.OP_JUMP_IF_FALSE:
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} -> {ip + 2 + self.bytecode[ip + 1]:04d}")
+                ip += 2
+            elif opcode == OpCode.OP_LOOP:
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} -> {ip + 2 - self.bytecode[ip + 1]:04d}")
+                ip += 2
+            elif opcode == OpCode.OP_COMPARE_JUMP:
+                comparison = OPCODE_NAMES[self.bytecode[ip + 1]]
+                print(f"{ip:04d}  {OPCODE_NAMES[opcode]:<16} {comparison} -> {ip + 3 + self.bytecode[ip + 2]:04d}")
+                ip += 3
+            else:
+                print(f"{ip:04d}  |{OPCODE_NAMES[opcode]}")
+                ip += 1
+
+    def instruction_count(self):
+        count = 0
+        ip = 0
+        while ip < len(self.bytecode):
+            ip += 1 + OPERANDS.get(self.bytecode[ip], 0)
+            count += 1
+        return count
+
+    def save_chunk(self, path):
+        from array import array
+        code = array("I", self.bytecode)
+        meta = marshal.dumps((pack_values(self.constants), self.varsNames, self.memoReads))
+        codeOffset = (CHUNK_HEADER.size + len(meta) + 7) & ~7
+        with open(path, "wb") as file:
+            file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, CHUNK_VERSION, CHUNK_ORDER,
+                                         len(meta), codeOffset, len(code)))
+            file.write(meta)
+            file.write(bytes(codeOffset - CHUNK_HEADER.size - len(meta)))
+            file.write(code.tobytes())
+
+    # Saves the whole machine state after a run, so a worker can restore it
+    # instead of executing its setup script again.
+    def save_snapshot(self, path):
+        from array import array
+        variables = flatten(self.variables)
+        variables = dict(zip(variables, pack_values(variables.values())))
+        state = (SNAPSHOT_VERSION, CHUNK_ORDER, self.varsNames, variables, pack_values(self.constants),
+                 array("I", self.bytecode).tobytes(), pack_values(self.stack), self.ip, self.memoReads)
+        try:
+            data = marshal.dumps(state)
+        except ValueError as e:
+            raise Exception("Snapshot supports only numbers and strings: " + str(e))
+        with open(path, "wb") as file:
+            file.write(SNAPSHOT_MAGIC)
+            file.write(data)
+
+    def print_stack(self):
+        print("Stack:", self.stack)
+    def print_constants(self):
+        print("Constants:", self.constants)
+    def print_variables(self):
+        print("Variables:", self.variables)
+    def print_memo(self):
+        print("Memo:", self.memo_report())
+
+    def push(self, value):
+        self.stack.append(value)
+    
+    def pop(self):
+        return self.stack.pop()
+
+    def peek(self):
+        return self.stack[-1]
+    
+    def const(self, value):
+        return self.constants[value]
+
+    # slot of a global, created on first declaration; names are interned so
+    # the dict lookups here and in run compare by identity
+    def declareGlobal(self, name):
+        index = self.globalsIndex.get(name)
+        if index is None:
+            if self.shared:
+                self.unshare("globals")
+            name = sys.intern(name)
+            if name not in self.variables:
+                self.variables[name] = None
+                self.frozen = None
+            self.varsNames.append(name)
+            index = self.globalsIndex[name] = len(self.varsNames) - 1
+        return index
+
+    def addGlobal(self, name, value):
+        index = self.declareGlobal(name)
+        self.variables[self.varsNames[index]] = value
+        self.frozen = None
+        self.write_chunk(OpCode.OP_SET_GLOBAL)
+        self.write_chunk(index)
+    
+    # sets a global without emitting code, e.g. a tenant's change to a fork
+    def setGlobal(self, name, value):
+        index = self.declareGlobal(name)
+        name = self.varsNames[index]
+        slots = self.memoDependents.get(name)
+        if slots is not None:
+            self.invalidateMemo(self.variables[name], value, slots)
+        self.variables[name] = value
+        self.frozen = None
+
+    def getGlobal(self, name):
+        index = self.variablesIndex(name)
+        if index == -1:
+            raise Exception("Undefined variable '" + name + "'")
+        self.write_chunk(OpCode.OP_GET_GLOBAL)
+        self.write_chunk(index)
+
+    def updateGlobal(self, name):
+        index = self.variablesIndex(name)
+        if index == -1:
+            raise Exception("Undefined variable '" + name + "'")
+        self.write_chunk(OpCode.OP_SET_GLOBAL)
+        self.write_chunk(index)
+   
+    def variablesIndex(self, name):
+        return self.globalsIndex.get(name, -1)
+
+    # registers a memoized expression reading the given globals, returns the
+    # slot OP_MEMO / OP_MEMO_STORE refer to
+    def addMemo(self, reads):
+        if self.shared:
+            self.unshare("memo")
+        reads = tuple(sys.intern(name) for name in reads)
+        self.memoReads.append(reads)
+        self.memo.append({})
+        slot = len(self.memoReads) - 1
+        for name in reads:
+            self.memoDependents.setdefault(name, []).append(slot)
+        return slot
+
+    # drops the cached results of the slots reading a global when a store
+    # really changes its value; storing an equal number or string keeps them
+    def invalidateMemo(self, old, new, slots):
+        if old is new or (type(old) is type(new) and type(new) in MEMO_SCALARS and old == new):
+            return
+        for slot in slots:
+            cache = self.memo[slot]
+            if cache:
+                self.memoStats["invalidations"] += len(cache)
+                cache.clear()
+
+    def memo_report(self):
+        report = dict(self.memoStats)
+        lookups = report["hits"] + report["misses"]
+        report["hit_rate"] = report["hits"] / lookups if lookups else 0.0
+        report["slots"] = len(self.memo)
+        report["entries"] = sum(len(cache) for cache in self.memo)
+        return report
+
+    # Runs until OP_RETURN or the end of the chunk and returns True. With a
+    # quantum, stops after that many instructions and returns False instead;
+    # calling run again resumes where it stopped.
+    #
+    # Instructions run in blocks of at most CHECK_INTERVAL; quantum, fuel and
+    # deadline are only looked at between blocks (the block is shortened so
+    # quantum and fuel are still exact), keeping the per-instruction cost to
+    # one counter.
+    def run(self, quantum=None):
+        remaining = quantum
+        # the run may store globals, so forks made after it freeze again
+        self.frozen = None
+        while True:
+            steps = CHECK_INTERVAL
+            if remaining is not None:
+                if remaining <= 0:
+                    return False
+                steps = min(steps, remaining)
+            if self.fuel is not None:
+                left = self.fuel - (self.executed - self.fuelStart)
+                if left <= 0 and self.ip < len(self.bytecode):
+                    raise FuelExhausted("Out of fuel", self.ip, self.executed - self.fuelStart)
+                steps = min(steps, left)
+            if self.deadline is not None and monotonic() >= self.deadline:
+                raise DeadlineExceeded("Deadline exceeded", self.ip, self.executed - self.fuelStart)
+            count = 0
+            while count < steps and self.ip < len(self.bytecode):
+                count += 1
+                opcode = self.bytecode[self.ip]
+                self.ip += 1
+                if opcode == OpCode.OP_CONSTANT:
+                    const_index = self.bytecode[self.ip]
+                    self.ip += 1
+                    self.push(self.const(const_index))
+                elif opcode == OpCode.OP_ADD:
+                    b = self.pop()
+                    a = self.pop()
+                    if self.maxResultBits is not None and result_bits(a, b, False) > self.maxResultBits:
+                        raise OperandTooLarge("Operands of '+' too large", self.ip - 1,
+                                              self.executed - self.fuelStart + count)
+                    self.push(a + b)
+                elif opcode == OpCode.OP_SUBTRACT:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(a - b)
+                elif opcode == OpCode.OP_MULTIPLY:
+                    b = self.pop()
+                    a = self.pop()
+                    if self.maxResultBits is not None and result_bits(a, b, True) > self.maxResultBits:
+                        raise OperandTooLarge("Operands of '*' too large", self.ip - 1,
+                                              self.executed - self.fuelStart + count)
+                    self.push(a * b)
+                elif opcode == OpCode.OP_DIVIDE:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(a / b)
+                elif opcode == OpCode.OP_MODULO:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(a % b)
+                elif opcode == OpCode.OP_POWER:
+                    b = self.pop()
+                    a = self.pop()
+                    # a ** b has at least (bits(a) - 1) * b + 1 bits; 0, 1 and -1
+                    # stay one bit whatever b is
+                    if self.maxPowerBits is not None and type(a) is int and type(b) is int \
+                            and b > 0 and (a > 1 or a < -1) \
+                            and (a.bit_length() - 1) * b + 1 > self.maxPowerBits:
+                        raise OperandTooLarge("Power operands too large", self.ip - 1,
+                                              self.executed - self.fuelStart + count)
+                    self.push(a ** b)
+                elif opcode == OpCode.OP_NEGATE:
+                    value = self.stack.pop()
+                    self.push(-value)
+                elif opcode == OpCode.OP_PRINT:
+                    value = self.pop()
+                    if type(value).__name__ == "ndarray":
+                        from .vector import summary
+                        value = summary(value)
+                    print(value)
+                elif opcode == OpCode.OP_POP:
+                    self.pop()
+                elif opcode == OpCode.OP_NIL:
+                    self.push(0)
+                elif opcode == OpCode.OP_TRUE:
+                    self.push(1)
+                elif opcode == OpCode.OP_FALSE:
+                    self.push(0)
+                elif opcode == OpCode.OP_SET_GLOBAL:
+                    index = self.bytecode[self.ip]
+                    self.ip += 1
+                    name  = self.varsNames[index]
+                    popValue =  self.peek()
+                    slots = self.memoDependents.get(name)
+                    if slots is not None:
+                        self.invalidateMemo(self.variables[name], popValue, slots)
+                    self.variables[name] = popValue
+
+                    #print("DEFINE GLOBAL VAR(",name,") Index:", index, " Value: ", popValue)
+
+                elif opcode == OpCode.OP_GET_GLOBAL:
+                    name_index = self.bytecode[self.ip]
+                    self.ip += 1
+                
+                    name  = self.varsNames[name_index]
+                    value = self.variables[name]
+                
+                    self.push(value)
+                    #print("GET GLOBAL VAR", name, "Value: ", value)
+
+                elif opcode == OpCode.OP_COMPARE_JUMP:
+                    comparison = self.bytecode[self.ip]
+                    offset = self.bytecode[self.ip + 1]
+                    self.ip += 2
+                    b = self.pop()
+                    a = self.pop()
+                    if not COMPARISONS[comparison](a, b):
+                        self.ip += offset
+                elif opcode == OpCode.OP_LOOP:
+                    self.ip += 1 - self.bytecode[self.ip]
+                elif opcode == OpCode.OP_JUMP_IF_FALSE:
+                    offset = self.bytecode[self.ip]
+                    self.ip += 1
+                    if not self.pop():
+                        self.ip += offset
+                elif opcode == OpCode.OP_JUMP:
+                    self.ip += 1 + self.bytecode[self.ip]
+                elif opcode == OpCode.OP_LESS:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a < b else 0)
+                elif opcode == OpCode.OP_LESS_EQUAL:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a <= b else 0)
+                elif opcode == OpCode.OP_GREATER:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a > b else 0)
+                elif opcode == OpCode.OP_GREATER_EQUAL:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a >= b else 0)
+                elif opcode == OpCode.OP_EQUAL:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a == b else 0)
+                elif opcode == OpCode.OP_NOT_EQUAL:
+                    b = self.pop()
+                    a = self.pop()
+                    self.push(1 if a != b else 0)
+                elif opcode == OpCode.OP_NOT:
+                    self.push(0 if self.pop() else 1)
+
+                elif opcode == OpCode.OP_MEMO:
+                    # slot, then how far to jump past the expression and its
+                    # OP_MEMO_STORE when the result is cached
+                    slot = self.bytecode[self.ip]
+                    skip = self.bytecode[self.ip + 1]
+                    self.ip += 2
+                    variables = self.variables
+                    key = memo_key([variables[name] for name in self.memoReads[slot]])
+                    cache = self.memo[slot]
+                    try:
+                        value = cache.pop(key, cache)
+                    except TypeError:
+                        # a vector (or other unhashable value) is read
+                        self.memoStats["uncacheable"] += 1
+                        self.memoPending.pop(slot, None)
+                        continue
+                    if value is not cache:
+                        cache[key] = value
+                        self.memoStats["hits"] += 1
+                        self.push(value)
+                        self.ip += skip
+                    else:
+                        self.memoStats["misses"] += 1
+                        self.memoPending[slot] = key
+                elif opcode == OpCode.OP_MEMO_STORE:
+                    slot = self.bytecode[self.ip]
+                    self.ip += 1
+                    key = self.memoPending.pop(slot, None)
+                    if key is not None:
+                        cache = self.memo[slot]
+                        if len(cache) >= self.memoCapacity:
+                            del cache[next(iter(cache))]
+                            self.memoStats["evictions"] += 1
+                        cache[key] = self.peek()
+                        self.memoStats["stores"] += 1
+                elif opcode == OpCode.OP_RETURN:
+                    self.executed += count
+                    return True
+                else:
+                    raise ValueError(f"Unknown opcode: {opcode}")
+            self.executed += count
+            if self.ip >= len(self.bytecode):
+                return True
+            if remaining is not None:
+                remaining -= count
+
+    # Limits for the next runs: at most `fuel` instructions, until `timeout`
+    # seconds from now, no integer '^' whose result would need more than
+    # `max_power_bits` bits, and no integer product, string repetition or
+    # string concatenation over `max_result_bits` bits (8 per character).
+    # None disables a limit.
+    def set_limits(self, fuel=None, timeout=None, max_power_bits=None, max_result_bits=None):
+        self.fuel = fuel
+        self.fuelStart = self.executed
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self.maxPowerBits = max_power_bits
+        self.maxResultBits = max_result_bits
+
+    # Cooperative version of run for asyncio code: runs quantum instructions at
+    # a time and yields to the event loop in between.
+    async def run_async(self, quantum=1000):
+        import asyncio
+        while not self.run(quantum):
+            await asyncio.sleep(0)
+
+
+# Cache key for the values a memoized expression reads. Types are part of it
+# (1 and 1.0 hash alike but give different results) and floats go by bit
+# pattern so 0.0 and -0.0 stay apart; unhashable values raise TypeError when
+# the key is looked up.
+def memo_key(values):
+    return tuple([(type(value), value.hex() if type(value) is float else value) for value in values])
+
+
+# Vectors (NumPy arrays) cannot be marshalled; these swap them for packed
+# tuples and back, loading pythonvm.vector only when a vector is present.
+def pack_values(values):
+    values = list(values)
+    for value in values:
+        if type(value).__name__ == "ndarray":
+            from .vector import pack_values
+            return pack_values(values)
+    return values
+
+
+def unpack_values(values):
+    values = list(values)
+    for value in values:
+        if type(value) is tuple:
+            from .vector import unpack_values
+            return unpack_values(values)
+    return values
+
+
+# Loads a chunk written by VirtualMachine.save_chunk. Only the constant pool and
+# the global names are unmarshalled; the bytecode stays in the page cache and
+# the VM runs directly over a memoryview of the mapping, so processes loading
+# the same file share one copy of it.
+def load_chunk(path):
+    with open(path, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < CHUNK_HEADER.size:
+        raise Exception("Invalid chunk file: " + str(path))
+    magic, version, order, metaSize, codeOffset, codeCount = CHUNK_HEADER.unpack_from(data, 0)
+    if magic != CHUNK_MAGIC or version != CHUNK_VERSION:
+        raise Exception("Invalid chunk file: " + str(path))
+    if order != CHUNK_ORDER:
+        raise Exception("Chunk file was written on a machine with another byte order: " + str(path))
+    if codeOffset + codeCount * 4 > len(data):
+        raise Exception("Truncated chunk file: " + str(path))
+    constants, names, memoReads = marshal.loads(data[CHUNK_HEADER.size:CHUNK_HEADER.size + metaSize])
+    vm = VirtualMachine()
+    vm.constants = unpack_values(constants)
+    for name in names:
+        vm.declareGlobal(name)
+    for reads in memoReads:
+        vm.addMemo(reads)
+    vm.chunk = data
+    vm.bytecode = memoryview(data)[codeOffset:codeOffset + codeCount * 4].cast("I")
+    # code compiled into the machine goes to a list copy of the mapping
+    vm.shared = frozenset(("bytecode",))
+    return vm
+
+
+def load_snapshot(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise Exception("Invalid snapshot file: " + str(path))
+    state = marshal.loads(memoryview(data)[len(SNAPSHOT_MAGIC):])
+    if state[0] != SNAPSHOT_VERSION:
+        raise Exception("Invalid snapshot file: " + str(path))
+    version, order, names, variables, constants, code, stack, ip, memoReads = state
+    if order != CHUNK_ORDER:
+        raise Exception("Snapshot was written on a machine with another byte order: " + str(path))
+    vm = VirtualMachine()
+    for name in names:
+        vm.declareGlobal(name)
+    vm.variables.update(zip(variables, unpack_values(variables.values())))
+    vm.constants = unpack_values(constants)
+    from array import array
+    vm.bytecode = array("I")
+    vm.bytecode.frombytes(code)
+    vm.stack = unpack_values(stack)
+    vm.ip = ip
+    for reads in memoReads:
+        vm.addMemo(reads)
+    return vm